@@ -1,17 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import AsyncIterator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.ambio_ai_strategy.generator_strategy import GeneratorStrategy
-from app.llm_services.domain_llm_wrapper import DomainLlmWrapper
+from app.ambio_ai_strategy.generator_strategy import LLM_ROLE_NAMES, GeneratorStrategy
+from app.config import settings
+from app.llm_services.domain_llm_wrapper import get_default_llm, sse_event
 from app.models.ambio_ai_chat import AmbioAiChat
 from app.models.enums import ChatRole, ReferenceType
 from app.utils.database_utils.chat_history_utils import (
     count_user_messages_for_session_by_mode,
-    create_chat_message,
-    get_chat_history_by_chat_id,
+    create_chat_message_in_background,
+    get_recent_chat_messages_for_llm,
 )
 
 
@@ -28,6 +30,9 @@ class ChatStrategy(GeneratorStrategy):
     def get_response_content_type(self) -> str:
         return "text/plain"
 
+    def supports_sse(self) -> bool:
+        return True
+
     async def generate_response(
         self,
         *,
@@ -36,9 +41,29 @@ class ChatStrategy(GeneratorStrategy):
         session_id: str,
         db: AsyncSession,
         extra: dict | None = None,
-    ) -> AsyncIterator[str]:
-        # Persist user message first
-        user_msg = await create_chat_message(
+    ) -> AsyncIterator[str | bytes]:
+        extra = extra or {}
+        sse = bool(extra.get("sse"))
+
+        # Build prior conversation for the model; the current prompt isn't
+        # persisted yet, so append it explicitly. A just-created chat has
+        # no history, so skip the query on first turns.
+        history = (
+            []
+            if extra.get("is_new_chat")
+            else await get_recent_chat_messages_for_llm(db, active_chat.chat_id, modes=("chat",))
+        )
+        model_messages: list[dict] = []
+        for m in history:
+            role = LLM_ROLE_NAMES.get(m.role)
+            if role is not None:
+                model_messages.append({"role": role, "content": m.content})
+        model_messages.append({"role": "user", "content": input_text})
+
+        # Persist the user message while the LLM request is in flight. The
+        # write has its own session and is shielded below, so a client
+        # disconnect mid-stream doesn't cancel it.
+        user_msg_task = create_chat_message_in_background(
             db=db,
             chat_id=active_chat.chat_id,
             role=ChatRole.USER,
@@ -48,28 +73,26 @@ class ChatStrategy(GeneratorStrategy):
             previous_message_id=None,
         )
 
-        # Build prior conversation for the model
-        history = await get_chat_history_by_chat_id(db, active_chat.chat_id)
-        model_messages: list[dict] = []
-        for m in history:
-            if m.role == ChatRole.USER:
-                model_messages.append({"role": "user", "content": m.content})
-            elif m.role == ChatRole.ASSISTANT:
-                model_messages.append({"role": "assistant", "content": m.content})
-
-        llm = DomainLlmWrapper()
-        full = ""
-        async for token in llm.stream_chat(model_messages):
-            full += token
-            yield token
+        parts: list[str] = []
+        try:
+            llm = get_default_llm()
+            async for token in llm.stream_chat(model_messages, coalesce_ms=settings.stream_coalesce_ms):
+                parts.append(token)
+                yield sse_event(token) if sse else token
+        finally:
+            user_msg = await asyncio.shield(user_msg_task)
 
-        await create_chat_message(
-            db=db,
-            chat_id=active_chat.chat_id,
-            role=ChatRole.ASSISTANT,
-            mode="chat",
-            content=full,
-            meta={"provider": llm.llm_name(), "model": llm.text_model_name(), "master_prompt": "applied"},
-            previous_message_id=user_msg.chat_history_id,
+        # Wait for the assistant insert before the generator returns so the
+        # next turn on this chat sees it; shielded like the user insert.
+        await asyncio.shield(
+            create_chat_message_in_background(
+                db=db,
+                chat_id=active_chat.chat_id,
+                role=ChatRole.ASSISTANT,
+                mode="chat",
+                content="".join(parts),
+                meta=llm.assistant_meta_chat,
+                previous_message_id=user_msg.chat_history_id,
+            )
         )
 
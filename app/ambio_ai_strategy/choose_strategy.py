@@ -6,9 +6,12 @@ from app.ambio_ai_strategy.registry import STRATEGY_REGISTRY
 
 
 def choose_strategy(mode: str | None) -> GeneratorStrategy:
-    m = (mode or "chat").strip().lower()
-    cls = STRATEGY_REGISTRY.get(m)
-    if not cls:
-        return BadStrategy(invalid_mode=m)
-    return cls()
+    m = mode or "chat"
+    # Fast path: clients almost always send an already-normalized mode.
+    inst = STRATEGY_REGISTRY.get(m)
+    if inst is not None:
+        return inst
 
+    m = m.strip().lower()
+    # BadStrategy carries the invalid mode, so it stays per-request.
+    return STRATEGY_REGISTRY.get(m) or BadStrategy(invalid_mode=m)
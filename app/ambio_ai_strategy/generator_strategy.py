@@ -6,7 +6,11 @@ from collections.abc import AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.ambio_ai_chat import AmbioAiChat
-from app.models.enums import ReferenceType
+from app.models.enums import ChatRole, ReferenceType
+
+# Model role for each stored chat role. Only user/assistant turns are sent to
+# the model; summaries are skipped.
+LLM_ROLE_NAMES: dict[ChatRole, str] = {ChatRole.USER: "user", ChatRole.ASSISTANT: "assistant"}
 
 
 class GeneratorStrategy(ABC):
@@ -22,6 +26,10 @@ class GeneratorStrategy(ABC):
     def get_response_content_type(self) -> str:
         raise NotImplementedError
 
+    def supports_sse(self) -> bool:
+        """Whether generate_response can emit SSE frames when extra["sse"] is set."""
+        return False
+
     @abstractmethod
     async def generate_response(
         self,
@@ -31,6 +39,6 @@ class GeneratorStrategy(ABC):
         session_id: str,
         db: AsyncSession,
         extra: dict | None = None,
-    ) -> AsyncIterator[str]:
+    ) -> AsyncIterator[str | bytes]:
         raise NotImplementedError
 
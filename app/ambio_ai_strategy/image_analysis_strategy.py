@@ -1,22 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 from collections.abc import AsyncIterator
 from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.ambio_ai_strategy.generator_strategy import GeneratorStrategy
-from app.llm_services.domain_llm_wrapper import DomainLlmWrapper
+from app.ambio_ai_strategy.generator_strategy import LLM_ROLE_NAMES, GeneratorStrategy
+from app.config import settings
+from app.llm_services.domain_llm_wrapper import get_default_llm
 from app.models.ambio_ai_chat import AmbioAiChat
 from app.models.enums import ChatRole, ReferenceType
 from app.utils.database_utils.chat_history_utils import (
     count_user_messages_for_session_by_mode,
-    create_chat_message,
-    get_chat_history_by_chat_id,
+    create_chat_message_in_background,
+    get_recent_chat_messages_for_llm,
 )
 
 
+_HASH_CHUNK_CHARS = 64 * 1024
+
+
+def _sha256_hex(text: str) -> str:
+    # Hash in slices so a multi-MB base64 payload is never copied whole.
+    # Slicing is by code point, so the digest matches text.encode("utf-8").
+    # For ASCII-only str (all valid base64) CPython's UTF-8 encode is a
+    # plain copy, so a separate "ascii" path buys nothing.
+    h = hashlib.sha256()
+    for i in range(0, len(text), _HASH_CHUNK_CHARS):
+        h.update(text[i : i + _HASH_CHUNK_CHARS].encode("utf-8"))
+    return h.hexdigest()
+
+
 class ImageAnalysisStrategy(GeneratorStrategy):
     def purpose(self) -> list[str]:
         return ["image_analysis"]
@@ -47,13 +63,29 @@ class ImageAnalysisStrategy(GeneratorStrategy):
         meta: dict[str, Any] = {"image_source": "url" if image_url else "base64"}
         if image_url:
             meta["image_url"] = image_url
-            meta["image_sha256"] = hashlib.sha256(image_url.encode("utf-8")).hexdigest()
+            meta["image_sha256"] = _sha256_hex(image_url)
         else:
             # Store only hash, never raw base64
             b64 = image_base64 or ""
-            meta["image_sha256"] = hashlib.sha256(b64.encode("utf-8")).hexdigest()
+            meta["image_sha256"] = _sha256_hex(b64)
+
+        # Optional: include prior text-only messages as context. A
+        # just-created chat has no history, so skip the query.
+        history = (
+            []
+            if extra.get("is_new_chat")
+            else await get_recent_chat_messages_for_llm(db, active_chat.chat_id, modes=("chat",))
+        )
+        prior: list[dict[str, Any]] = []
+        for m in history:
+            role = LLM_ROLE_NAMES.get(m.role)
+            if role is not None:
+                prior.append({"role": role, "content": m.content})
 
-        user_msg = await create_chat_message(
+        # Persist the user message while the LLM request is in flight. The
+        # write has its own session and is shielded below, so a client
+        # disconnect mid-stream doesn't cancel it.
+        user_msg_task = create_chat_message_in_background(
             db=db,
             chat_id=active_chat.chat_id,
             role=ChatRole.USER,
@@ -63,33 +95,32 @@ class ImageAnalysisStrategy(GeneratorStrategy):
             previous_message_id=None,
         )
 
-        # Optional: include prior text-only messages as context
-        history = await get_chat_history_by_chat_id(db, active_chat.chat_id)
-        prior: list[dict[str, Any]] = []
-        for m in history:
-            if m.role == ChatRole.USER and m.mode == "chat":
-                prior.append({"role": "user", "content": m.content})
-            elif m.role == ChatRole.ASSISTANT and m.mode == "chat":
-                prior.append({"role": "assistant", "content": m.content})
-
-        llm = DomainLlmWrapper()
-        full = ""
-        async for token in llm.stream_image_analysis(
-            prompt=input_text,
-            image_url=image_url,
-            image_base64=image_base64,
-            prior_messages=prior,
-        ):
-            full += token
-            yield token
-
-        await create_chat_message(
-            db=db,
-            chat_id=active_chat.chat_id,
-            role=ChatRole.ASSISTANT,
-            mode="image_analysis",
-            content=full,
-            meta={"provider": llm.llm_name(), "model": llm.vision_model_name(), "master_prompt": "applied"},
-            previous_message_id=user_msg.chat_history_id,
+        parts: list[str] = []
+        try:
+            llm = get_default_llm()
+            async for token in llm.stream_image_analysis(
+                prompt=input_text,
+                image_url=image_url,
+                image_base64=image_base64,
+                prior_messages=prior,
+                coalesce_ms=settings.stream_coalesce_ms,
+            ):
+                parts.append(token)
+                yield token
+        finally:
+            user_msg = await asyncio.shield(user_msg_task)
+
+        # Wait for the assistant insert before the generator returns so the
+        # next turn on this chat sees it; shielded like the user insert.
+        await asyncio.shield(
+            create_chat_message_in_background(
+                db=db,
+                chat_id=active_chat.chat_id,
+                role=ChatRole.ASSISTANT,
+                mode="image_analysis",
+                content="".join(parts),
+                meta=llm.assistant_meta_vision,
+                previous_message_id=user_msg.chat_history_id,
+            )
         )
 
@@ -9,8 +9,9 @@ from app.models.ambio_ai_chat import AmbioAiChat
 from app.models.enums import ChatRole, ReferenceType
 from app.utils.database_utils.chat_history_utils import (
     count_user_messages_for_session_by_mode,
-    create_chat_message,
+    create_chat_messages,
 )
+from app.utils.uuid_utils import uuid7
 
 
 class ImageStrategy(GeneratorStrategy):
@@ -43,32 +44,35 @@ class ImageStrategy(GeneratorStrategy):
         db: AsyncSession,
         extra: dict | None = None,
     ) -> AsyncIterator[str]:
-        # Persist user message
-        user_msg = await create_chat_message(
-            db=db,
-            chat_id=active_chat.chat_id,
-            role=ChatRole.USER,
-            mode="image",
-            content=input_text,
-            meta=None,
-            previous_message_id=None,
-        )
-
         # Stubbed response - image generation not implemented
         stub_response = (
             '{"status": "stub", "message": "Image generation is not implemented. '
             'This is a placeholder response.", "image_url": null}'
         )
 
-        # Persist assistant message
-        await create_chat_message(
-            db=db,
-            chat_id=active_chat.chat_id,
-            role=ChatRole.ASSISTANT,
-            mode="image",
-            content=stub_response,
-            meta={"provider": "stub", "model": "none", "status": "not_implemented"},
-            previous_message_id=user_msg.chat_history_id,
+        # Persist the user/assistant pair in one round trip
+        user_msg_id = uuid7()
+        await create_chat_messages(
+            db,
+            [
+                {
+                    "chat_history_id": user_msg_id,
+                    "chat_id": active_chat.chat_id,
+                    "role": ChatRole.USER,
+                    "mode": "image",
+                    "content": input_text,
+                    "meta": None,
+                    "previous_message_id": None,
+                },
+                {
+                    "chat_id": active_chat.chat_id,
+                    "role": ChatRole.ASSISTANT,
+                    "mode": "image",
+                    "content": stub_response,
+                    "meta": {"provider": "stub", "model": "none", "status": "not_implemented"},
+                    "previous_message_id": user_msg_id,
+                },
+            ],
         )
 
         yield stub_response
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import sys
 from typing import Type
 
 from app.ambio_ai_strategy.generator_strategy import GeneratorStrategy
 
-STRATEGY_REGISTRY: dict[str, Type[GeneratorStrategy]] = {}
+# Strategies are stateless, so one shared instance per mode is enough.
+STRATEGY_REGISTRY: dict[str, GeneratorStrategy] = {}
 
 
 def register_strategies(*strategy_classes: Type[GeneratorStrategy]) -> None:
     for cls in strategy_classes:
-        for p in cls().purpose():
-            STRATEGY_REGISTRY[p] = cls
-
+        inst = cls()
+        for p in inst.purpose():
+            STRATEGY_REGISTRY[sys.intern(p)] = inst
@@ -10,12 +10,22 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
     # Core
+    # "dev" creates missing tables on startup; elsewhere run `alembic upgrade head`.
+    environment: str = "dev"
     database_url: str = "sqlite+aiosqlite:///./app.db"
     allowed_cors_origins: str = "*"
 
+    # Database connection pool (ignored for SQLite)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle_seconds: int = 1800
+
     # Auth - these have dev defaults but will warn if used
     secret_key: str = "dev-secret"
     admin_api_token: str = "dev-admin-token"
+    # Verify plain HS256 tokens without PyJWT; unusual tokens still go
+    # through PyJWT either way.
+    jwt_fast_path: bool = True
 
     @model_validator(mode="after")
     def _warn_insecure_defaults(self) -> "Settings":
@@ -48,10 +58,29 @@ class Settings(BaseSettings):
     default_text_model: str = "gpt-4o-mini"
     default_vision_model: str = "gpt-4o-mini"
 
-    # Rate limiting
+    # Streaming: merge LLM deltas arriving within this many ms (None = off)
+    stream_coalesce_ms: float | None = None
+
+    # Redis (optional; requires the `redis` package). When set, the response
+    # cache and rate limits are shared across workers.
+    redis_url: str | None = None
+    # Connections per worker's pool; a request holds one only for a command.
+    redis_max_connections: int = 64
+
+    # Response cache for repeated prompts (None = off). Uses Redis when
+    # REDIS_URL is set, else in-process.
+    response_cache_ttl_seconds: int | None = None
+
+    # Per-worker cache of active-session lookups (0 = off). A logout on one
+    # worker is seen by the others only after this many seconds.
+    session_cache_ttl_seconds: float = 30.0
+
+    # Rate limiting (shared across workers via Redis when REDIS_URL is set,
+    # otherwise enforced per process)
     rate_limit_session: str = "10/minute"  # Session creation
     rate_limit_chat: str = "20/minute"  # Chat requests
     rate_limit_chat_image: str = "5/minute"  # Image analysis (more expensive)
+    rate_limit_prompts: str = "30/minute"  # Prompt admin + listing
 
 
 settings = Settings()
@@ -1,18 +1,43 @@
 from __future__ import annotations
 
 from collections.abc import AsyncGenerator
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+import orjson
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.config import settings
 
 
-engine = create_async_engine(settings.database_url, echo=False, poolclass=NullPool)
+def _json_serializer(value: Any) -> str:
+    return orjson.dumps(value).decode()
+
+
+def _create_engine() -> AsyncEngine:
+    # JSON columns (e.g. chat history meta) round-trip through orjson rather
+    # than the stdlib json module.
+    json_opts: dict[str, Any] = {"json_serializer": _json_serializer, "json_deserializer": orjson.loads}
+    if settings.database_url.startswith("sqlite"):
+        # SQLite connections are cheap and file-local; keep them unpooled.
+        return create_async_engine(settings.database_url, echo=False, poolclass=NullPool, **json_opts)
+    return create_async_engine(
+        settings.database_url,
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=True,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        **json_opts,
+    )
+
+
+engine = _create_engine()
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
-
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class utcnow(FunctionElement):
+    """
+    Current UTC time as a naive timestamp, evaluated by the database.
+
+    Used for server-side created_at/updated_at defaults. Unlike func.now(),
+    it is UTC on every backend and keeps sub-second precision on SQLite,
+    which chat history ordering relies on.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element: utcnow, compiler: Any, **kw: Any) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element: utcnow, compiler: Any, **kw: Any) -> str:
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element: utcnow, compiler: Any, **kw: Any) -> str:
+    # Padded to microseconds so stored values compare correctly (as text)
+    # against datetimes bound from Python.
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+def dialect_insert(db: AsyncSession) -> Callable[..., postgresql.Insert | sqlite.Insert]:
+    """
+    Return the insert() construct for the session's dialect.
+
+    Both PostgreSQL and SQLite variants support on_conflict_do_nothing() /
+    on_conflict_do_update(), so callers can write one upsert for either.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pydantic import BaseModel, Field, model_validator
 
+from app.utils.image_input import classify_image_input
+
 
 class ChatReq(BaseModel):
     chat_id: str | None = None
@@ -19,10 +21,10 @@ class ChatReq(BaseModel):
         if m == "chat":
             return self
         if m == "image_analysis":
-            has_url = bool(self.image_url)
-            has_b64 = bool(self.image_base64)
-            if has_url == has_b64:
-                raise ValueError("For mode=image_analysis, provide exactly one of image_url or image_base64.")
+            try:
+                classify_image_input(self.image_url, self.image_base64)
+            except ValueError:
+                raise ValueError("For mode=image_analysis, provide exactly one of image_url or image_base64.") from None
             return self
         # allow other modes to be handled by BadStrategy
         return self
@@ -1,18 +1,84 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import functools
 import ipaddress
 import socket
 from collections.abc import AsyncIterator
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Literal
 from urllib.parse import urlparse
 
-from openai import AsyncOpenAI
+import orjson
 
 from app.config import settings
+from app.utils.image_input import classify_image_input, is_strict_base64, validate_image_content
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 Role = Literal["system", "developer", "user", "assistant"]
 
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+
+
+def sse_event(token: str) -> bytes:
+    """Encode a streamed token as a ready-to-send SSE `data:` frame."""
+    return _SSE_PREFIX + orjson.dumps({"token": token}) + _SSE_SUFFIX
+
+
+async def coalesce_tokens(tokens: AsyncIterator[str], window_ms: float) -> AsyncIterator[str]:
+    """
+    Merge tokens arriving within `window_ms` of each other into one chunk.
+
+    The first token is passed through immediately so time-to-first-token is
+    unaffected; later tokens are batched until the window elapses.
+    """
+    loop = asyncio.get_running_loop()
+    window = window_ms / 1000
+    batch: list[str] = []
+    deadline = 0.0
+    first = True
+    pending: asyncio.Future[str] | None = None
+    try:
+        while True:
+            if pending is None:
+                # Keep a single in-flight read so a flush never cancels it.
+                pending = asyncio.ensure_future(anext(tokens))
+            timeout = max(0.0, deadline - loop.time()) if batch else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield "".join(batch)
+                batch.clear()
+                continue
+
+            fut, pending = pending, None
+            try:
+                token = fut.result()
+            except StopAsyncIteration:
+                break
+            if first:
+                first = False
+                yield token
+                continue
+            if not batch:
+                deadline = loop.time() + window
+            batch.append(token)
+    finally:
+        if pending is not None:
+            pending.cancel()
+            # Let the cancelled read unwind before closing the source.
+            await asyncio.wait({pending})
+        # Close the upstream stream now rather than at garbage collection
+        # when the consumer stops early (e.g. client disconnect).
+        aclose = getattr(tokens, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    if batch:
+        yield "".join(batch)
+
 
 def _is_private_ip(ip_str: str) -> bool:
     """Check if an IP address is private/internal."""
@@ -29,37 +95,6 @@ def _is_private_ip(ip_str: str) -> bool:
         return False
 
 
-# Magic bytes for common image formats
-IMAGE_MAGIC_BYTES = {
-    b"\xff\xd8\xff": "image/jpeg",
-    b"\x89PNG\r\n\x1a\n": "image/png",
-    b"GIF87a": "image/gif",
-    b"GIF89a": "image/gif",
-    b"RIFF": "image/webp",  # WebP starts with RIFF....WEBP
-}
-
-
-def validate_image_content(data: bytes) -> str:
-    """
-    Validate that the given bytes represent a valid image.
-
-    Returns:
-        The detected MIME type if valid
-
-    Raises:
-        ValueError if the content is not a recognized image format
-    """
-    for magic, mime_type in IMAGE_MAGIC_BYTES.items():
-        if data.startswith(magic):
-            return mime_type
-
-    # Special check for WebP (RIFF....WEBP)
-    if data[:4] == b"RIFF" and len(data) > 12 and data[8:12] == b"WEBP":
-        return "image/webp"
-
-    raise ValueError("Invalid image format. Supported formats: JPEG, PNG, GIF, WebP")
-
-
 def validate_image_url(url: str) -> None:
     """
     Validate an image URL for SSRF protection.
@@ -105,10 +140,28 @@ class DomainLlmWrapper:
         key = api_key or settings.openai_api_key
         if not key:
             raise RuntimeError("OPENAI_API_KEY is required to use DomainLlmWrapper.")
-        self._client = AsyncOpenAI(api_key=key)
+        # Imported here so loading this module (validators, SSE helpers)
+        # doesn't pull in the OpenAI SDK until a client is actually needed.
+        from openai import AsyncOpenAI
+
+        self._client: AsyncOpenAI = AsyncOpenAI(api_key=key)
         self._text_model = text_model or settings.default_text_model
         self._vision_model = vision_model or settings.default_vision_model
         self._master_prompt = master_prompt or settings.master_prompt
+        # Built once and shared; the SDK only serializes it.
+        self._master_prompt_msg: dict[str, Any] = {"role": "developer", "content": self._master_prompt}
+        # Meta persisted with assistant replies; constant per wrapper and
+        # shared across messages, so treat as read-only.
+        self.assistant_meta_chat: dict[str, Any] = {
+            "provider": self.llm_name(),
+            "model": self._text_model,
+            "master_prompt": "applied",
+        }
+        self.assistant_meta_vision: dict[str, Any] = {
+            "provider": self.llm_name(),
+            "model": self._vision_model,
+            "master_prompt": "applied",
+        }
 
     def llm_name(self) -> str:
         return "openai"
@@ -124,18 +177,31 @@ class DomainLlmWrapper:
 
     def _with_master_prompt(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
         # Put master prompt up front so it dominates behavior.
-        return [{"role": "developer", "content": self._master_prompt}, *messages]
+        return [self._master_prompt_msg, *messages]
 
-    async def stream_chat(self, messages: list[dict[str, Any]]) -> AsyncIterator[str]:
+    @staticmethod
+    async def _iter_deltas(stream: Any) -> AsyncIterator[str]:
+        async for chunk in stream:
+            delta = chunk.choices[0].delta
+            if delta and delta.content:
+                yield delta.content
+
+    def _maybe_coalesce(self, tokens: AsyncIterator[str], coalesce_ms: float | None) -> AsyncIterator[str]:
+        return coalesce_tokens(tokens, coalesce_ms) if coalesce_ms else tokens
+
+    async def stream_chat(
+        self,
+        messages: list[dict[str, Any]],
+        *,
+        coalesce_ms: float | None = None,
+    ) -> AsyncIterator[str]:
         stream = await self._client.chat.completions.create(
             model=self._text_model,
             messages=self._with_master_prompt(messages),
             stream=True,
         )
-        async for chunk in stream:
-            delta = chunk.choices[0].delta
-            if delta and delta.content:
-                yield delta.content
+        async for token in self._maybe_coalesce(self._iter_deltas(stream), coalesce_ms):
+            yield token
 
     async def stream_image_analysis(
         self,
@@ -144,32 +210,28 @@ class DomainLlmWrapper:
         image_url: str | None = None,
         image_base64: str | None = None,
         prior_messages: list[dict[str, Any]] | None = None,
+        coalesce_ms: float | None = None,
     ) -> AsyncIterator[str]:
-        if bool(image_url) == bool(image_base64):
-            raise ValueError("Provide exactly one of image_url or image_base64.")
-
-        image_part: dict[str, Any]
-        if image_url:
-            validate_image_url(image_url)
-            image_part = {"type": "image_url", "image_url": {"url": image_url}}
+        kind, payload = classify_image_input(image_url, image_base64)
+        if kind == "url":
+            validate_image_url(payload)
+            url = payload
+        elif kind == "data_url":
+            # Caller already sent a data URL; preserve it.
+            url = payload
         else:
-            # Accept raw base64 and convert to a data URL.
-            # If caller already sends a data URL, preserve it.
-            b64 = image_base64 or ""
-            if b64.startswith("data:"):
-                data_url = b64
-            else:
-                # Validate base64 and check image format
-                try:
-                    decoded = base64.b64decode(b64, validate=True)
-                    # Validate it's actually an image (check magic bytes)
-                    mime_type = validate_image_content(decoded[:16])
-                except ValueError:
-                    raise
-                except Exception as e:  # noqa: BLE001
-                    raise ValueError("image_base64 must be valid base64 or a data URL.") from e
-                data_url = f"data:{mime_type};base64,{b64}"
-            image_part = {"type": "image_url", "image_url": {"url": data_url}}
+            # Raw base64: validate shape without decoding the whole payload,
+            # then sniff the image format from the leading bytes only.
+            if not is_strict_base64(payload):
+                raise ValueError("image_base64 must be valid base64 or a data URL.")
+            try:
+                head = base64.b64decode(payload[:24], validate=True)
+            except Exception as e:  # noqa: BLE001
+                raise ValueError("image_base64 must be valid base64 or a data URL.") from e
+            # Validate it's actually an image (check magic bytes)
+            mime_type = validate_image_content(head[:16])
+            url = f"data:{mime_type};base64,{payload}"
+        image_part: dict[str, Any] = {"type": "image_url", "image_url": {"url": url}}
 
         msgs: list[dict[str, Any]] = []
         if prior_messages:
@@ -189,8 +251,16 @@ class DomainLlmWrapper:
             messages=self._with_master_prompt(msgs),
             stream=True,
         )
-        async for chunk in stream:
-            delta = chunk.choices[0].delta
-            if delta and delta.content:
-                yield delta.content
+        async for token in self._maybe_coalesce(self._iter_deltas(stream), coalesce_ms):
+            yield token
+
 
+@functools.lru_cache(maxsize=1)
+def get_default_llm() -> DomainLlmWrapper:
+    """
+    Return the process-wide DomainLlmWrapper built from settings.
+
+    Reusing one instance keeps the underlying AsyncOpenAI client (and its
+    HTTP connection pool) alive across requests.
+    """
+    return DomainLlmWrapper()
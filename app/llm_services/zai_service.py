@@ -4,18 +4,42 @@ from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
+import orjson
 
 from app.config import settings
 from app.llm_services.llm_service import LlmService
+from app.utils.response_cache import get_response_cache, response_cache_key
+
+# Shared across all ZaiService instances so keep-alive connections and TLS
+# sessions to api.z.ai are reused. Created lazily, closed on app shutdown.
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client, if it was ever created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 
 class ZaiService(LlmService):
     """
     Z.ai API service implementation.
 
-    Uses httpx to call the Z.ai API endpoint.
-    Note: Z.ai API is non-streaming, but we wrap the response as a stream
-    for consistency with the LlmService interface.
+    Uses httpx to call the Z.ai API endpoint and streams the completion
+    back as SSE deltas.
     """
 
     ZAI_API_URL = "https://api.z.ai/api/paas/v4/chat/completions"
@@ -32,6 +56,12 @@ class ZaiService(LlmService):
             raise RuntimeError("ZAI_API_KEY is required to use ZaiService.")
         self._model = model
         self._master_prompt = master_prompt or settings.master_prompt
+        # Built once and shared; only ever serialized.
+        self._master_prompt_msg: dict[str, Any] = {"role": "system", "content": self._master_prompt}
+        self._headers = {
+            "Authorization": f"Bearer {self._api_key}",
+            "Content-Type": "application/json",
+        }
 
     def llm_name(self) -> str:
         return "zai"
@@ -44,31 +74,54 @@ class ZaiService(LlmService):
 
     def _with_master_prompt(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Prepend the master prompt as a system message."""
-        return [{"role": "system", "content": self._master_prompt}, *messages]
+        return [self._master_prompt_msg, *messages]
 
     async def generate_response_stream(self, messages: list[dict[str, Any]]) -> AsyncIterator[str]:
         """
-        Generate a response from Z.ai API.
+        Generate a streaming response from Z.ai API.
 
-        Note: Z.ai is non-streaming, so we yield the full response at once.
+        Parses the SSE `data:` frames and yields each content delta as it
+        arrives. When the response cache is enabled, a cached completion
+        for the exact same messages is returned without calling the API.
         """
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                self.ZAI_API_URL,
-                headers={
-                    "Authorization": f"Bearer {self._api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
+        cache = get_response_cache()
+        key = None
+        if cache is not None:
+            key = response_cache_key(self._model, self._master_prompt, messages)
+            cached = await cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts: list[str] = []
+        async with _get_client().stream(
+            "POST",
+            self.ZAI_API_URL,
+            headers=self._headers,
+            # Serialized with orjson instead of httpx's stdlib json path.
+            content=orjson.dumps(
+                {
                     "model": self._model,
                     "messages": self._with_master_prompt(messages),
-                    "stream": False,
-                },
-            )
+                    "stream": True,
+                }
+            ),
+        ) as response:
             response.raise_for_status()
-            data = response.json()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                if not data:
+                    continue
+                choices = orjson.loads(data).get("choices") or [{}]
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    parts.append(content)
+                    yield content
 
-            # Extract the assistant message content
-            content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-            if content:
-                yield content
+        # Only complete responses are cached; an aborted stream never gets here.
+        if cache is not None and parts:
+            await cache.set(key, "".join(parts))
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
 
+import orjson
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -13,23 +17,54 @@ from sqlalchemy.exc import SQLAlchemyError
 from app.config import settings
 from app.database.base import Base
 from app.database.database import engine
+from app.llm_services.zai_service import close_client as close_zai_client
 from app.routers.chat_router import router as chat_router
 from app.routers.history_router import router as history_router
 from app.routers.prompt_router import router as prompt_router
 from app.routers.session_router import router as session_router
+from app.utils.audit_logger import start_audit_logging, stop_audit_logging
+from app.utils.database_utils.chat_history_utils import drain_background_writes
 from app.utils.rate_limiter import limiter
+from app.utils.redis_client import close_redis
+from app.utils.response_cache import close_response_cache
 
 logger = logging.getLogger(__name__)
 
 
-def _cors_origins() -> list[str]:
-    raw = (settings.allowed_cors_origins or "*").strip()
+def _parse_origins(raw: str | None) -> list[str]:
+    raw = (raw or "*").strip()
     if raw == "*":
         return ["*"]
     return [o.strip() for o in raw.split(",") if o.strip()]
 
 
-app = FastAPI(title="Ambio AI API", version="1.0.0")
+CORS_ORIGINS: list[str] = _parse_origins(settings.allowed_cors_origins)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    start_audit_logging()
+    # Schema is owned by Alembic migrations; only dev bootstraps it here so a
+    # fresh checkout runs without a migrate step.
+    if settings.environment == "dev":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    yield
+    await drain_background_writes()
+    await close_zai_client()
+    await close_response_cache()
+    await close_redis()
+    stop_audit_logging()
+
+
+app = FastAPI(title="Ambio AI API", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Add rate limiter
 app.state.limiter = limiter
@@ -37,7 +72,7 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=_cors_origins(),
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -47,19 +82,20 @@ app.add_middleware(
 
 # Exception handlers
 @app.exception_handler(HTTPException)
-async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: HTTPException) -> ORJSONResponse:
     """Handle HTTP exceptions with consistent format."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"error": exc.detail, "status_code": exc.status_code},
+        headers=exc.headers,
     )
 
 
 @app.exception_handler(ValidationError)
-async def validation_exception_handler(request: Request, exc: ValidationError) -> JSONResponse:
+async def validation_exception_handler(request: Request, exc: ValidationError) -> ORJSONResponse:
     """Handle Pydantic validation errors."""
     logger.warning(f"Validation error: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "Validation error",
@@ -70,31 +106,25 @@ async def validation_exception_handler(request: Request, exc: ValidationError) -
 
 
 @app.exception_handler(SQLAlchemyError)
-async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError) -> JSONResponse:
+async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError) -> ORJSONResponse:
     """Handle database errors."""
     logger.error(f"Database error: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"error": "Database error", "status_code": 500},
     )
 
 
 @app.exception_handler(Exception)
-async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def generic_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
     """Handle unexpected errors."""
     logger.exception(f"Unexpected error: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"error": "Internal server error", "status_code": 500},
     )
 
 
-@app.on_event("startup")
-async def on_startup() -> None:
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-
 app.include_router(session_router, prefix="/api/v1")
 app.include_router(chat_router, prefix="/api/v1")
 app.include_router(history_router, prefix="/api/v1")
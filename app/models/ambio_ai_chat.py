@@ -1,20 +1,21 @@
 from __future__ import annotations
 
-import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, String
+from sqlalchemy import Boolean, DateTime, String, Uuid
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database.base import Base
+from app.database.functions import utcnow
+from app.utils.uuid_utils import uuid7
 
 
 class AmbioAiChat(Base):
     __tablename__ = "ambio_ai_chat"
 
-    chat_id: Mapped[str] = mapped_column(String(64), primary_key=True, default=lambda: str(uuid.uuid4()))
-    session_id: Mapped[str] = mapped_column(String(64), index=True)
+    chat_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True, default=uuid7)
+    session_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), index=True)
     title: Mapped[str] = mapped_column(String(120))
     is_archived: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
 
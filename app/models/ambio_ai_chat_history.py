@@ -1,25 +1,34 @@
 from __future__ import annotations
 
-import uuid
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import DateTime, Enum, JSON, String, Text
+from sqlalchemy import DateTime, Enum, Index, JSON, String, Text, Uuid
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database.base import Base
+from app.database.functions import utcnow
+from app.utils.uuid_utils import uuid7
 from app.models.enums import ChatRole
 
 
 class AmbioAiChatHistory(Base):
     __tablename__ = "ambio_ai_chat_history"
+    # Serves "WHERE chat_id = ? ORDER BY created_at, chat_history_id" (and
+    # keyset pages on that pair) in either direction without a sort step;
+    # also covers plain chat_id lookups. ix_chat_history_chat_role_mode lets
+    # per-session quota counts be answered from the index alone.
+    __table_args__ = (
+        Index("ix_chat_history_chat_created_id", "chat_id", "created_at", "chat_history_id"),
+        Index("ix_chat_history_chat_role_mode", "chat_id", "role", "mode"),
+    )
 
-    chat_history_id: Mapped[str] = mapped_column(String(64), primary_key=True, default=lambda: str(uuid.uuid4()))
-    chat_id: Mapped[str] = mapped_column(String(64), index=True)
-    previous_message_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    chat_history_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True, default=uuid7)
+    chat_id: Mapped[str] = mapped_column(Uuid(as_uuid=False))
+    previous_message_id: Mapped[str | None] = mapped_column(Uuid(as_uuid=False), nullable=True)
     role: Mapped[ChatRole] = mapped_column(Enum(ChatRole), index=True)
     mode: Mapped[str] = mapped_column(String(64), index=True)
     content: Mapped[str] = mapped_column(Text)
     meta: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), index=True)
 
@@ -1,24 +1,25 @@
 from __future__ import annotations
 
-import uuid
-from datetime import datetime, timezone
+from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, String, Text
+from sqlalchemy import Boolean, DateTime, String, Text, Uuid
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database.base import Base
+from app.database.functions import utcnow
+from app.utils.uuid_utils import uuid7
 
 
 class AmbioAiPrompts(Base):
     __tablename__ = "ambio_ai_prompts"
 
-    prompt_id: Mapped[str] = mapped_column(String(64), primary_key=True, default=lambda: str(uuid.uuid4()))
+    prompt_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True, default=uuid7)
     name: Mapped[str] = mapped_column(String(120), unique=True, index=True)
     content: Mapped[str] = mapped_column(Text)
     is_archived: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=utcnow(),
+        onupdate=utcnow(),
     )
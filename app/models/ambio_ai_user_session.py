@@ -3,19 +3,35 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Enum, String
+from sqlalchemy import Boolean, DateTime, Enum, Index, String, Uuid, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database.base import Base
+from app.database.functions import utcnow
 from app.models.enums import ReferenceType
 
 
 class AmbioAiUserSession(Base):
     __tablename__ = "ambio_ai_user_session"
+    # At most one active session per user/fingerprint; session creation
+    # upserts against this index instead of SELECT-then-INSERT.
+    __table_args__ = (
+        Index(
+            "uq_user_session_active_reference",
+            "unique_reference_id",
+            "reference_type",
+            unique=True,
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+    )
 
-    session_id: Mapped[str] = mapped_column(String(64), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # Random v4, not time-ordered v7 like the other tables: the session id is
+    # the client's credential, so it shouldn't expose a timestamp or fewer
+    # random bits.
+    session_id: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
     unique_reference_id: Mapped[str] = mapped_column(String(256), index=True)
     reference_type: Mapped[ReferenceType] = mapped_column(Enum(ReferenceType), index=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
 
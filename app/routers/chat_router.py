@@ -11,12 +11,12 @@ from app.database.database import get_db
 from app.dto.req.chat_req import ChatReq
 from app.utils.database_utils.chat_utils import get_or_create_chat
 from app.utils.database_utils.session_utils import get_active_session
-from app.utils.rate_limiter import limiter
+from app.utils.rate_limiter import limiter, rate_limit
 
 router = APIRouter()
 
 
-@router.post("/chat")
+@router.post("/chat", dependencies=[Depends(rate_limit("chat", settings.rate_limit_chat))])
 @limiter.limit(settings.rate_limit_chat)
 async def chat(
     request: Request,
@@ -31,25 +31,38 @@ async def chat(
     if not sess:
         raise HTTPException(status_code=401, detail="Invalid or inactive session.")
 
+    # Use the stored (canonical) id from here on rather than the raw header.
+    session_id = sess.session_id
     strategy = choose_strategy(body.mode)
-    ok = await strategy.run_validation(db, x_session_id, sess.reference_type)
+    ok = await strategy.run_validation(db, session_id, sess.reference_type)
     if not ok:
         raise HTTPException(status_code=403, detail="Usage limit or access tier violated.")
 
-    active_chat = await get_or_create_chat(db=db, session_id=x_session_id, chat_id=body.chat_id, prompt=body.prompt)
+    active_chat, is_new_chat = await get_or_create_chat(
+        db=db, session_id=session_id, chat_id=body.chat_id, prompt=body.prompt
+    )
+
+    # Clients opt in to SSE framing via the Accept header.
+    sse = strategy.supports_sse() and "text/event-stream" in request.headers.get("accept", "")
+    content_type = "text/event-stream" if sse else strategy.get_response_content_type()
 
     async def gen():
         async for chunk in strategy.generate_response(
             input_text=body.prompt,
             active_chat=active_chat,
-            session_id=x_session_id,
+            session_id=session_id,
             db=db,
-            extra={"image_url": body.image_url, "image_base64": body.image_base64},
+            extra={
+                "image_url": body.image_url,
+                "image_base64": body.image_base64,
+                "sse": sse,
+                "is_new_chat": is_new_chat,
+            },
         ):
             yield chunk
 
-    resp = StreamingResponse(gen(), media_type=strategy.get_response_content_type())
+    resp = StreamingResponse(gen(), media_type=content_type)
     resp.headers["X-Chat-Id"] = active_chat.chat_id
-    resp.headers["X-Content-Type"] = strategy.get_response_content_type()
+    resp.headers["X-Content-Type"] = content_type
     return resp
 
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+import orjson
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.database import get_db
 from app.models.ambio_ai_chat import AmbioAiChat
-from app.models.ambio_ai_chat_history import AmbioAiChatHistory
 from app.utils.audit_logger import log_suspicious_access
-from app.utils.database_utils.chat_utils import list_chats_for_session
+from app.utils.database_utils.chat_history_utils import get_chat_history_by_chat_id, iter_chat_history
+from app.utils.database_utils.chat_utils import list_chats_with_last_message
 from app.utils.database_utils.session_utils import get_active_session
+from app.utils.uuid_utils import normalize_uuid
 
 router = APIRouter()
 
@@ -21,60 +27,74 @@ async def list_history(x_session_id: str | None = Header(default=None), db: Asyn
     sess = await get_active_session(db, x_session_id)
     if not sess:
         raise HTTPException(status_code=401, detail="Invalid or inactive session.")
-    chats = await list_chats_for_session(db, x_session_id)
-    return [{"chat_id": c.chat_id, "title": c.title} for c in chats]
+    return await list_chats_with_last_message(db, sess.session_id)
 
 
-@router.get("/chat-history/{chat_id}")
-async def get_chat_history(
-    request: Request,
-    chat_id: str,
-    x_session_id: str | None = Header(default=None),
-    page: int = Query(default=1, ge=1),
-    page_size: int = Query(default=10, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
-):
+async def _require_owned_chat(request: Request, chat_id: str, x_session_id: str | None, db: AsyncSession) -> str:
+    """Check the session and that it owns chat_id; return the normalized chat_id."""
     if not x_session_id:
         raise HTTPException(status_code=400, detail="Missing x-session-id header.")
     sess = await get_active_session(db, x_session_id)
     if not sess:
         raise HTTPException(status_code=401, detail="Invalid or inactive session.")
 
-    # Verify chat belongs to this session
-    chat = await db.scalar(
-        select(AmbioAiChat).where(
-            AmbioAiChat.chat_id == chat_id,
-            AmbioAiChat.session_id == x_session_id,
-        )
-    )
-    if not chat:
-        # Check if chat exists at all - if it does, this might be an unauthorized access attempt
-        any_chat = await db.scalar(select(AmbioAiChat).where(AmbioAiChat.chat_id == chat_id))
-        if any_chat:
+    normalized = normalize_uuid(chat_id)
+    if normalized is None:
+        raise HTTPException(status_code=404, detail="Chat not found.")
+
+    # Verify chat belongs to this session. One lookup tells apart a missing
+    # chat from someone else's (the latter might be an unauthorized access attempt).
+    owner_id = await db.scalar(select(AmbioAiChat.session_id).where(AmbioAiChat.chat_id == normalized))
+    if owner_id != sess.session_id:
+        if owner_id is not None:
             log_suspicious_access(
                 "attempted_access_to_other_session_chat",
                 request,
-                {"attempted_chat_id": chat_id},
+                {"attempted_chat_id": normalized},
             )
         raise HTTPException(status_code=404, detail="Chat not found.")
+    return normalized
+
+
+@router.get("/chat-history/{chat_id}")
+async def get_chat_history(
+    request: Request,
+    chat_id: str,
+    x_session_id: str | None = Header(default=None),
+    before: datetime | None = Query(default=None),
+    before_id: str | None = Query(default=None),
+    page_size: int = Query(default=10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    chat_id = await _require_owned_chat(request, chat_id, x_session_id, db)
+
+    cursor = None
+    if before is not None or before_id is not None:
+        cursor_id = normalize_uuid(before_id)
+        if before is None or cursor_id is None:
+            raise HTTPException(status_code=400, detail="before and before_id must be provided together.")
+        cursor = (before, cursor_id)
+    # Rows are plain mappings and serialize without building ORM instances.
+    msgs, next_cursor = await get_chat_history_by_chat_id(db, chat_id, before=cursor, limit=page_size)
+    return {
+        "messages": msgs,
+        "next_before": next_cursor[0] if next_cursor else None,
+        "next_before_id": next_cursor[1] if next_cursor else None,
+    }
+
+
+@router.get("/chat-history/{chat_id}/export")
+async def export_chat_history(
+    request: Request,
+    chat_id: str,
+    x_session_id: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream a chat's full history as NDJSON, oldest message first."""
+    chat_id = await _require_owned_chat(request, chat_id, x_session_id, db)
 
-    offset = (page - 1) * page_size
-    res = await db.execute(
-        select(AmbioAiChatHistory)
-        .where(AmbioAiChatHistory.chat_id == chat_id)
-        .order_by(AmbioAiChatHistory.created_at.desc())
-        .offset(offset)
-        .limit(page_size)
-    )
-    msgs = list(res.scalars().all())
-    return [
-        {
-            "role": m.role,
-            "mode": m.mode,
-            "content": m.content,
-            "meta": m.meta,
-            "created_at": m.created_at,
-        }
-        for m in msgs
-    ]
+    async def lines() -> AsyncIterator[bytes]:
+        async for row in iter_chat_history(db, chat_id):
+            yield orjson.dumps(dict(row), option=orjson.OPT_APPEND_NEWLINE)
 
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hmac
 import logging
 from typing import Any
 
@@ -12,10 +13,14 @@ from app.config import settings
 from app.database.database import get_db
 from app.models.ambio_ai_prompts import AmbioAiPrompts
 from app.utils.audit_logger import log_admin_action
+from app.utils.rate_limiter import limiter, rate_limit
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Encoded once; settings are fixed for the life of the process.
+_ADMIN_TOKEN_BYTES = settings.admin_api_token.encode()
+
 
 class PromptCreate(BaseModel):
     name: str = Field(min_length=1, max_length=120)
@@ -31,11 +36,13 @@ class PromptResponse(BaseModel):
 
 def validate_admin_token(token: str | None) -> None:
     """Validate that the provided token matches the admin API token."""
-    if not token or token != settings.admin_api_token:
+    # Constant-time compare so response timing doesn't leak the token.
+    if not token or not hmac.compare_digest(token.encode(), _ADMIN_TOKEN_BYTES):
         raise HTTPException(status_code=403, detail="Invalid or missing admin token.")
 
 
-@router.put("/prompts")
+@router.put("/prompts", dependencies=[Depends(rate_limit("prompts", settings.rate_limit_prompts))])
+@limiter.limit(settings.rate_limit_prompts)
 async def create_or_update_prompt(
     request: Request,
     body: PromptCreate,
@@ -70,19 +77,17 @@ async def create_or_update_prompt(
     return {"prompt_id": prompt.prompt_id, "name": prompt.name, "action": "created"}
 
 
-@router.get("/prompts")
-async def list_prompts(db: AsyncSession = Depends(get_db)) -> list[PromptResponse]:
+@router.get("/prompts", dependencies=[Depends(rate_limit("prompts", settings.rate_limit_prompts))])
+@limiter.limit(settings.rate_limit_prompts)
+async def list_prompts(request: Request, db: AsyncSession = Depends(get_db)) -> list[PromptResponse]:
     """Get all non-archived prompts."""
+    # Select just the response fields; no ORM instances are built.
     result = await db.execute(
-        select(AmbioAiPrompts).where(AmbioAiPrompts.is_archived.is_(False))
+        select(
+            AmbioAiPrompts.prompt_id,
+            AmbioAiPrompts.name,
+            AmbioAiPrompts.content,
+            AmbioAiPrompts.is_archived,
+        ).where(AmbioAiPrompts.is_archived.is_(False))
     )
-    prompts = list(result.scalars().all())
-    return [
-        PromptResponse(
-            prompt_id=p.prompt_id,
-            name=p.name,
-            content=p.content,
-            is_archived=p.is_archived,
-        )
-        for p in prompts
-    ]
+    return [PromptResponse(**p) for p in result.mappings()]
@@ -13,14 +13,14 @@ from app.utils.database_utils.session_utils import (
     get_active_session,
     invalidate_session,
 )
-from app.utils.jwtutils import extract_bearer_token, validate_token
-from app.utils.rate_limiter import limiter
+from app.utils.jwtutils import extract_bearer_token, invalidate_token, validate_token
+from app.utils.rate_limiter import limiter, rate_limit
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-@router.post("/session")
+@router.post("/session", dependencies=[Depends(rate_limit("session", settings.rate_limit_session))])
 @limiter.limit(settings.rate_limit_session)
 async def create_session(
     request: Request,
@@ -82,12 +82,14 @@ async def create_session(
 @router.delete("/session")
 async def delete_session(
     x_session_id: str | None = Header(default=None),
+    authorization: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Invalidate the current session (logout).
 
-    Requires x-session-id header.
+    Requires x-session-id header. A Bearer token, if sent, is dropped from
+    the token validation cache.
     """
     if not x_session_id:
         raise HTTPException(status_code=400, detail="Missing x-session-id header.")
@@ -99,6 +101,9 @@ async def delete_session(
 
     # Invalidate the session
     await invalidate_session(db, x_session_id)
+    token = extract_bearer_token(authorization)
+    if token:
+        invalidate_token(token)
     logger.info(f"Session invalidated: {x_session_id}")
 
     return {"message": "Session invalidated successfully."}
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import logging
+import queue
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 from fastapi import Request
@@ -10,16 +12,58 @@ from fastapi import Request
 audit_logger = logging.getLogger("audit")
 audit_logger.setLevel(logging.INFO)
 
-# Ensure audit logs go to a separate handler if needed
-if not audit_logger.handlers:
-    handler = logging.StreamHandler()
-    handler.setFormatter(
-        logging.Formatter(
-            "[AUDIT] %(asctime)s - %(levelname)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
+
+class _DeferredQueueHandler(QueueHandler):
+    # The queue is in-process, so hand records over as-is; message
+    # formatting then happens on the listener thread, not the event loop.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# Audit records go to their own stream handler, written by a listener thread
+# so request handlers never block on IO.
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter(
+        "[AUDIT] %(asctime)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
     )
-    audit_logger.addHandler(handler)
+)
+
+_queue_handler: QueueHandler | None = None
+_listener: QueueListener | None = None
+
+
+def start_audit_logging() -> None:
+    """Attach the queue handler and start its listener (no-op if running)."""
+    global _queue_handler, _listener
+    # Leave handlers configured elsewhere alone.
+    if _listener is not None or audit_logger.handlers:
+        return
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _queue_handler = _DeferredQueueHandler(records)
+    _listener = QueueListener(records, _stream_handler)
+    _listener.start()
+    audit_logger.addHandler(_queue_handler)
+
+
+def stop_audit_logging() -> None:
+    """
+    Flush queued audit records and stop the listener (used on shutdown).
+
+    The queue handler is detached too, so records logged afterwards aren't
+    queued with nothing left to write them; start_audit_logging() restores it.
+    """
+    global _queue_handler, _listener
+    if _queue_handler is not None:
+        audit_logger.removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+start_audit_logging()
 
 
 def log_admin_action(
@@ -52,7 +96,7 @@ def log_admin_action(
     if details:
         log_entry["details"] = details
 
-    audit_logger.info(f"Admin action: {log_entry}")
+    audit_logger.info("Admin action: %s", log_entry)
 
 
 def log_suspicious_access(
@@ -85,4 +129,4 @@ def log_suspicious_access(
     if details:
         log_entry["details"] = details
 
-    audit_logger.warning(f"Suspicious access: {log_entry}")
+    audit_logger.warning("Suspicious access: %s", log_entry)
@@ -1,14 +1,55 @@
 from __future__ import annotations
 
-import uuid
+import asyncio
+import logging
+from collections.abc import AsyncIterator
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import Row, RowMapping, func, insert, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.ambio_ai_chat_history import AmbioAiChatHistory
 from app.models.enums import ChatRole
+from app.utils.uuid_utils import uuid7
+
+logger = logging.getLogger(__name__)
+
+# Strong references to in-flight background writes so they aren't GC'd.
+_pending_writes: set[asyncio.Task[AmbioAiChatHistory]] = set()
+
+# Columns returned to clients when reading a chat's history.
+_HISTORY_COLUMNS = (
+    AmbioAiChatHistory.chat_history_id,
+    AmbioAiChatHistory.role,
+    AmbioAiChatHistory.mode,
+    AmbioAiChatHistory.content,
+    AmbioAiChatHistory.meta,
+    AmbioAiChatHistory.created_at,
+)
+_STREAM_BATCH_SIZE = 500
+
+
+async def create_chat_messages(db: AsyncSession, messages: list[dict[str, Any]]) -> list[AmbioAiChatHistory]:
+    """
+    Insert several chat messages with one INSERT ... RETURNING and commit once.
+
+    Each dict holds AmbioAiChatHistory column values. A missing
+    chat_history_id gets a time-ordered UUID, so messages written in one
+    batch (which share a created_at) still sort in list order. Server
+    defaults come back via RETURNING, so no refresh is needed.
+    """
+    rows = [{"chat_history_id": uuid7(), **m} for m in messages]
+    # render_nulls keeps rows with None values in the same batch, so the
+    # whole list goes out as a single multi-row INSERT.
+    result = await db.scalars(
+        insert(AmbioAiChatHistory).returning(AmbioAiChatHistory, sort_by_parameter_order=True),
+        rows,
+        execution_options={"render_nulls": True},
+    )
+    msgs = list(result)
+    await db.commit()
+    return msgs
 
 
 async def create_chat_message(
@@ -21,43 +62,167 @@ async def create_chat_message(
     meta: dict[str, Any] | None = None,
     previous_message_id: str | None = None,
 ) -> AmbioAiChatHistory:
-    msg = AmbioAiChatHistory(
-        chat_history_id=str(uuid.uuid4()),
-        chat_id=chat_id,
-        previous_message_id=previous_message_id,
-        role=role,
-        mode=mode,
-        content=content,
-        meta=meta,
-        created_at=datetime.utcnow(),
+    (msg,) = await create_chat_messages(
+        db,
+        [
+            {
+                "chat_id": chat_id,
+                "previous_message_id": previous_message_id,
+                "role": role,
+                "mode": mode,
+                "content": content,
+                "meta": meta,
+            }
+        ],
     )
-    db.add(msg)
-    await db.commit()
-    await db.refresh(msg)
     return msg
 
 
-async def get_chat_history_by_chat_id(db: AsyncSession, chat_id: str) -> list[AmbioAiChatHistory]:
+async def get_chat_history_by_chat_id(
+    db: AsyncSession,
+    chat_id: str,
+    *,
+    before: tuple[datetime, str] | None = None,
+    limit: int = 50,
+) -> tuple[list[RowMapping], tuple[datetime, str] | None]:
+    """
+    Return one page of a chat's messages, newest first.
+
+    Keyset pagination on (created_at, chat_history_id): each page is an
+    index range scan of at most `limit` rows, however long the chat is.
+
+    Args:
+        before: Cursor from the previous page; None for the newest page
+        limit: Maximum number of messages to return
+
+    Returns:
+        The message rows and the cursor for the next (older) page, or None
+        if this is the last page
+    """
+    stmt = select(*_HISTORY_COLUMNS).where(AmbioAiChatHistory.chat_id == chat_id)
+    if before is not None:
+        stmt = stmt.where(tuple_(AmbioAiChatHistory.created_at, AmbioAiChatHistory.chat_history_id) < before)
+    res = await db.execute(
+        stmt.order_by(AmbioAiChatHistory.created_at.desc(), AmbioAiChatHistory.chat_history_id.desc())
+        # One extra row tells us whether another page exists.
+        .limit(limit + 1)
+    )
+    rows = list(res.mappings().all())
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1]["created_at"], rows[-1]["chat_history_id"])
+
+
+async def iter_chat_history(db: AsyncSession, chat_id: str) -> AsyncIterator[RowMapping]:
+    """
+    Yield every message of a chat, oldest first, without buffering them all.
+
+    For exports of whole chats; rows arrive from the cursor in batches of
+    `_STREAM_BATCH_SIZE`, so memory stays flat however long the chat is.
+    """
+    stmt = (
+        select(*_HISTORY_COLUMNS)
+        .where(AmbioAiChatHistory.chat_id == chat_id)
+        .order_by(AmbioAiChatHistory.created_at.asc(), AmbioAiChatHistory.chat_history_id.asc())
+        .execution_options(yield_per=_STREAM_BATCH_SIZE)
+    )
+    result = await db.stream(stmt)
+    async for row in result.mappings():
+        yield row
+
+
+def create_chat_message_in_background(
+    *,
+    db: AsyncSession,
+    chat_id: str,
+    role: ChatRole,
+    mode: str,
+    content: str,
+    meta: dict[str, Any] | None = None,
+    previous_message_id: str | None = None,
+) -> asyncio.Task[AmbioAiChatHistory]:
+    """
+    Persist a chat message in a tracked task and return that task.
+
+    The write runs in its own session bound to the same engine as `db`,
+    since the request session may be closed before the task finishes.
+    Callers that need the row await the task through `asyncio.shield`, so
+    a cancelled request (client disconnect) doesn't cancel the write.
+    """
+
+    async def _write() -> AmbioAiChatHistory:
+        async with AsyncSession(db.bind, expire_on_commit=False) as session:
+            return await create_chat_message(
+                db=session,
+                chat_id=chat_id,
+                role=role,
+                mode=mode,
+                content=content,
+                meta=meta,
+                previous_message_id=previous_message_id,
+            )
+
+    task = asyncio.create_task(_write())
+    _pending_writes.add(task)
+    task.add_done_callback(_on_background_write_done)
+    return task
+
+
+def _on_background_write_done(task: asyncio.Task[AmbioAiChatHistory]) -> None:
+    _pending_writes.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error("Background chat message write failed", exc_info=task.exception())
+
+
+async def drain_background_writes() -> None:
+    """Wait for all in-flight background writes (used on shutdown)."""
+    if _pending_writes:
+        await asyncio.gather(*_pending_writes, return_exceptions=True)
+
+
+async def get_recent_chat_messages_for_llm(
+    db: AsyncSession,
+    chat_id: str,
+    limit: int = 40,
+    modes: tuple[str, ...] | None = None,
+) -> list[Row[tuple[ChatRole, str, str]]]:
+    """
+    Return the most recent (role, content, mode) rows of a chat, oldest first.
+
+    Only the columns needed to build model context are selected, and the
+    result is capped at `limit` rows so per-turn cost doesn't grow with
+    the chat length.
+    """
+    stmt = select(AmbioAiChatHistory.role, AmbioAiChatHistory.content, AmbioAiChatHistory.mode).where(
+        AmbioAiChatHistory.chat_id == chat_id
+    )
+    if modes:
+        stmt = stmt.where(AmbioAiChatHistory.mode.in_(modes))
     res = await db.execute(
-        select(AmbioAiChatHistory).where(AmbioAiChatHistory.chat_id == chat_id).order_by(AmbioAiChatHistory.created_at.asc())
+        stmt.order_by(AmbioAiChatHistory.created_at.desc(), AmbioAiChatHistory.chat_history_id.desc()).limit(limit)
     )
-    return list(res.scalars().all())
+    # Plain Row tuples; no ORM instances or identity-map entries are built.
+    rows = res.all()
+    rows.reverse()
+    return rows
 
 
 async def count_user_messages_for_session_by_mode(db: AsyncSession, session_id: str, mode: str) -> int:
-    # Count across all chats belonging to session_id
+    # Count across all chats belonging to session_id. COUNT(*) over an IN
+    # subquery needs no join and no history row fetch: both sides are
+    # served by (session_id) and (chat_id, role, mode) indexes.
     from app.models.ambio_ai_chat import AmbioAiChat
 
+    session_chats = select(AmbioAiChat.chat_id).where(AmbioAiChat.session_id == session_id)
     stmt = (
-        select(func.count(AmbioAiChatHistory.chat_history_id))
+        select(func.count())
         .select_from(AmbioAiChatHistory)
-        .join(AmbioAiChat, AmbioAiChat.chat_id == AmbioAiChatHistory.chat_id)
         .where(
-            AmbioAiChat.session_id == session_id,
+            AmbioAiChatHistory.chat_id.in_(session_chats),
             AmbioAiChatHistory.role == ChatRole.USER,
             AmbioAiChatHistory.mode == mode,
         )
     )
     val = await db.scalar(stmt)
     return int(val or 0)
-
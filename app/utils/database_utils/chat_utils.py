@@ -1,12 +1,64 @@
 from __future__ import annotations
 
-import uuid
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import RowMapping, Select, bindparam, func, insert, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.ambio_ai_chat import AmbioAiChat
+from app.models.ambio_ai_chat_history import AmbioAiChatHistory
+from app.utils.uuid_utils import normalize_uuid
+
+# Length of the last-message preview returned with the chat list.
+_PREVIEW_CHARS = 100
+
+# Hot statements, built once; only the bound values change per call.
+_SESSION_CHAT_BY_ID = lambda_stmt(
+    lambda: select(AmbioAiChat).where(
+        AmbioAiChat.chat_id == bindparam("chat_id"), AmbioAiChat.session_id == bindparam("session_id")
+    )
+)
+_SESSION_CHATS = lambda_stmt(
+    lambda: select(AmbioAiChat)
+    .where(AmbioAiChat.session_id == bindparam("session_id"), AmbioAiChat.is_archived.is_(False))
+    .order_by(AmbioAiChat.created_at.desc())
+)
+
+
+def _chats_with_last_message_stmt() -> Select[tuple[str, str, str | None, datetime | None]]:
+    """
+    A session's chats with a preview of each chat's latest message.
+
+    The latest message per chat is picked with ROW_NUMBER() over only this
+    session's chats, then outer-joined so empty chats are still listed
+    (with null preview fields).
+    """
+    chat_filter = (AmbioAiChat.session_id == bindparam("session_id"), AmbioAiChat.is_archived.is_(False))
+    latest = (
+        select(
+            AmbioAiChatHistory.chat_id,
+            func.substr(AmbioAiChatHistory.content, 1, _PREVIEW_CHARS).label("last_message"),
+            AmbioAiChatHistory.created_at.label("last_message_at"),
+            func.row_number()
+            .over(
+                partition_by=AmbioAiChatHistory.chat_id,
+                order_by=(AmbioAiChatHistory.created_at.desc(), AmbioAiChatHistory.chat_history_id.desc()),
+            )
+            .label("rn"),
+        )
+        .join(AmbioAiChat, AmbioAiChat.chat_id == AmbioAiChatHistory.chat_id)
+        .where(*chat_filter)
+        .subquery()
+    )
+    return (
+        select(AmbioAiChat.chat_id, AmbioAiChat.title, latest.c.last_message, latest.c.last_message_at)
+        .outerjoin(latest, (latest.c.chat_id == AmbioAiChat.chat_id) & (latest.c.rn == 1))
+        .where(*chat_filter)
+        .order_by(AmbioAiChat.created_at.desc())
+    )
+
+
+_CHATS_WITH_LAST_MESSAGE = _chats_with_last_message_stmt()
 
 
 async def get_or_create_chat(
@@ -15,30 +67,34 @@ async def get_or_create_chat(
     session_id: str,
     chat_id: str | None,
     prompt: str,
-) -> AmbioAiChat:
+) -> tuple[AmbioAiChat, bool]:
+    """Return the chat and whether it was created by this call."""
+    # An unknown or malformed chat_id, or one owned by another session,
+    # starts a new chat.
+    chat_id = normalize_uuid(chat_id)
     if chat_id:
-        existing = await db.scalar(select(AmbioAiChat).where(AmbioAiChat.chat_id == chat_id))
+        existing = await db.scalar(_SESSION_CHAT_BY_ID, {"chat_id": chat_id, "session_id": session_id})
         if existing:
-            return existing
-
-    chat = AmbioAiChat(
-        chat_id=str(uuid.uuid4()),
-        session_id=session_id,
-        title=(prompt or "")[:50],
-        is_archived=False,
-        created_at=datetime.utcnow(),
+            return existing, False
+
+    # RETURNING hands back the generated id and server defaults, so no
+    # refresh round trip is needed.
+    chat = await db.scalar(
+        insert(AmbioAiChat)
+        .values(session_id=session_id, title=(prompt or "")[:50], is_archived=False)
+        .returning(AmbioAiChat)
     )
-    db.add(chat)
     await db.commit()
-    await db.refresh(chat)
-    return chat
+    return chat, True
 
 
 async def list_chats_for_session(db: AsyncSession, session_id: str) -> list[AmbioAiChat]:
-    res = await db.execute(
-        select(AmbioAiChat)
-        .where(AmbioAiChat.session_id == session_id, AmbioAiChat.is_archived.is_(False))
-        .order_by(AmbioAiChat.created_at.desc())
-    )
+    res = await db.execute(_SESSION_CHATS, {"session_id": session_id})
     return list(res.scalars().all())
 
+
+
+async def list_chats_with_last_message(db: AsyncSession, session_id: str) -> list[RowMapping]:
+    """List a session's chats with a preview of each chat's latest message, in one query."""
+    res = await db.execute(_CHATS_WITH_LAST_MESSAGE, {"session_id": session_id})
+    return list(res.mappings().all())
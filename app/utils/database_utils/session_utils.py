@@ -1,19 +1,92 @@
 from __future__ import annotations
 
 import hashlib
-import uuid
-from datetime import datetime, timezone
+from dataclasses import dataclass
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, lambda_stmt, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.database.functions import dialect_insert
 from app.models.ambio_ai_user_session import AmbioAiUserSession
 from app.models.enums import ReferenceType
+from app.utils.ttl_cache import MISSING, TTLCache
+from app.utils.uuid_utils import normalize_uuid
+
+
+@dataclass(frozen=True)
+class ActiveSession:
+    """Snapshot of an active session; safe to share across requests."""
+
+    session_id: str
+    reference_type: ReferenceType
+
+
+# session_id -> ActiveSession, or None for ids known not to be active. Every
+# authenticated request checks its session, so this skips a DB round trip
+# per request. Per process: logging out is seen by other workers only after
+# the TTL.
+_active_session_cache: TTLCache[str, ActiveSession | None] = TTLCache(
+    maxsize=10_000, ttl=settings.session_cache_ttl_seconds
+)
+# Misses expire sooner, but still blunt repeated probing with bogus ids.
+_NEGATIVE_TTL_SECONDS = min(5.0, settings.session_cache_ttl_seconds)
+
+# Hot lookups, built once; only the bound values change per call.
+_ACTIVE_SESSION_BY_REFERENCE = lambda_stmt(
+    lambda: select(AmbioAiUserSession).where(
+        AmbioAiUserSession.unique_reference_id == bindparam("unique_reference_id"),
+        AmbioAiUserSession.reference_type == bindparam("reference_type"),
+        AmbioAiUserSession.is_active.is_(True),
+    )
+)
+_ACTIVE_SESSION_BY_ID = lambda_stmt(
+    lambda: select(AmbioAiUserSession.session_id, AmbioAiUserSession.reference_type).where(
+        AmbioAiUserSession.session_id == bindparam("session_id"),
+        AmbioAiUserSession.is_active.is_(True),
+    )
+)
 
 
 def _generate_fingerprint(user_agent: str | None, accept_language: str | None, client_ip: str | None) -> str:
+    # Only needs to be collision-resistant within the session table, so a
+    # 128-bit BLAKE2b digest (32 hex chars) is plenty.
     raw = f"{user_agent or ''}|{accept_language or ''}|{client_ip or ''}".encode("utf-8")
-    return hashlib.sha256(raw).hexdigest()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+async def _get_or_create_active_session(
+    db: AsyncSession, unique_reference_id: str, reference_type: ReferenceType
+) -> AmbioAiUserSession:
+    # One round trip in the common case; concurrent first requests for the
+    # same reference can't both insert because of the partial unique index.
+    insert = dialect_insert(db)
+    stmt = (
+        insert(AmbioAiUserSession)
+        .values(
+            unique_reference_id=unique_reference_id,
+            reference_type=reference_type,
+            is_active=True,
+        )
+        .on_conflict_do_nothing(
+            index_elements=["unique_reference_id", "reference_type"],
+            index_where=text("is_active"),
+        )
+        .returning(AmbioAiUserSession)
+    )
+    # The conflicting row can be deactivated between the INSERT and the
+    # SELECT, leaving nothing to return; one more INSERT settles that race.
+    for _ in range(2):
+        sess = await db.scalar(stmt)
+        if sess is None:
+            sess = await db.scalar(
+                _ACTIVE_SESSION_BY_REFERENCE,
+                {"unique_reference_id": unique_reference_id, "reference_type": reference_type},
+            )
+        if sess is not None:
+            await db.commit()
+            return sess
+    raise RuntimeError("Could not create or find an active session for this reference.")
 
 
 async def create_anonymous_session(
@@ -24,62 +97,30 @@ async def create_anonymous_session(
     client_ip: str | None,
 ) -> AmbioAiUserSession:
     fingerprint = _generate_fingerprint(user_agent, accept_language, client_ip)
-    existing = await db.scalar(
-        select(AmbioAiUserSession).where(
-            AmbioAiUserSession.unique_reference_id == fingerprint,
-            AmbioAiUserSession.reference_type == ReferenceType.NON_SIGNED_IN_USER,
-            AmbioAiUserSession.is_active.is_(True),
-        )
-    )
-    if existing:
-        return existing
-
-    sess = AmbioAiUserSession(
-        session_id=str(uuid.uuid4()),
-        unique_reference_id=fingerprint,
-        reference_type=ReferenceType.NON_SIGNED_IN_USER,
-        is_active=True,
-        created_at=datetime.now(timezone.utc),
-    )
-    db.add(sess)
-    await db.commit()
-    await db.refresh(sess)
-    return sess
+    return await _get_or_create_active_session(db, fingerprint, ReferenceType.NON_SIGNED_IN_USER)
 
 
 async def create_signed_in_session(*, db: AsyncSession, user_id: str) -> AmbioAiUserSession:
-    existing = await db.scalar(
-        select(AmbioAiUserSession).where(
-            AmbioAiUserSession.unique_reference_id == user_id,
-            AmbioAiUserSession.reference_type == ReferenceType.SIGNED_IN_USER,
-            AmbioAiUserSession.is_active.is_(True),
-        )
-    )
-    if existing:
-        return existing
-
-    sess = AmbioAiUserSession(
-        session_id=str(uuid.uuid4()),
-        unique_reference_id=user_id,
-        reference_type=ReferenceType.SIGNED_IN_USER,
-        is_active=True,
-        created_at=datetime.now(timezone.utc),
-    )
-    db.add(sess)
-    await db.commit()
-    await db.refresh(sess)
+    return await _get_or_create_active_session(db, user_id, ReferenceType.SIGNED_IN_USER)
+
+
+async def get_active_session(db: AsyncSession, session_id: str) -> ActiveSession | None:
+    session_id = normalize_uuid(session_id)
+    if session_id is None:
+        return None
+    cached = _active_session_cache.get(session_id, MISSING)
+    if cached is not MISSING:
+        return cached
+
+    row = (await db.execute(_ACTIVE_SESSION_BY_ID, {"session_id": session_id})).first()
+    if row is None:
+        _active_session_cache.set(session_id, None, ttl=_NEGATIVE_TTL_SECONDS)
+        return None
+    sess = ActiveSession(session_id=row.session_id, reference_type=row.reference_type)
+    _active_session_cache.set(session_id, sess)
     return sess
 
 
-async def get_active_session(db: AsyncSession, session_id: str) -> AmbioAiUserSession | None:
-    return await db.scalar(
-        select(AmbioAiUserSession).where(
-            AmbioAiUserSession.session_id == session_id,
-            AmbioAiUserSession.is_active.is_(True),
-        )
-    )
-
-
 async def invalidate_session(db: AsyncSession, session_id: str) -> bool:
     """
     Invalidate a session by setting is_active to False.
@@ -87,15 +128,18 @@ async def invalidate_session(db: AsyncSession, session_id: str) -> bool:
     Returns:
         True if session was found and invalidated, False if not found
     """
-    session = await db.scalar(
-        select(AmbioAiUserSession).where(AmbioAiUserSession.session_id == session_id)
-    )
-    if not session:
+    session_id = normalize_uuid(session_id)
+    if session_id is None:
         return False
-
-    session.is_active = False
+    result = await db.execute(
+        update(AmbioAiUserSession)
+        .where(AmbioAiUserSession.session_id == session_id)
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
     await db.commit()
-    return True
+    _active_session_cache.pop(session_id)
+    return result.rowcount > 0
 
 
 async def invalidate_all_sessions_for_user(db: AsyncSession, user_id: str) -> int:
@@ -106,16 +150,17 @@ async def invalidate_all_sessions_for_user(db: AsyncSession, user_id: str) -> in
         Number of sessions invalidated
     """
     result = await db.execute(
-        select(AmbioAiUserSession).where(
+        update(AmbioAiUserSession)
+        .where(
             AmbioAiUserSession.unique_reference_id == user_id,
             AmbioAiUserSession.is_active.is_(True),
         )
+        .values(is_active=False)
+        .returning(AmbioAiUserSession.session_id)
+        .execution_options(synchronize_session=False)
     )
-    sessions = list(result.scalars().all())
-
-    for session in sessions:
-        session.is_active = False
-
+    session_ids = list(result.scalars())
     await db.commit()
-    return len(sessions)
-
+    for session_id in session_ids:
+        _active_session_cache.pop(session_id)
+    return len(session_ids)
@@ -1,23 +1,32 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
+from app.utils.uuid_utils import normalize_uuid
+
+# Built once; per call only the bound values change, so neither statement
+# construction nor the compiled-SQL cache lookup is repeated.
+_ACTIVE_USER_BY_ID = lambda_stmt(
+    lambda: select(User).where(User.user_id == bindparam("user_id"), User.is_active.is_(True))
+)
+_ACTIVE_USER_BY_EMAIL = lambda_stmt(
+    lambda: select(User).where(User.email == bindparam("email"), User.is_active.is_(True))
+)
 
 
 async def find_user_by_userid(db: AsyncSession, user_id: str) -> User | None:
     """Find a user by their user_id."""
-    return await db.scalar(
-        select(User).where(User.user_id == user_id, User.is_active.is_(True))
-    )
+    user_id = normalize_uuid(user_id)
+    if user_id is None:
+        return None
+    return await db.scalar(_ACTIVE_USER_BY_ID, {"user_id": user_id})
 
 
 async def find_user_by_email(db: AsyncSession, email: str) -> User | None:
     """Find a user by their email."""
-    return await db.scalar(
-        select(User).where(User.email == email, User.is_active.is_(True))
-    )
+    return await db.scalar(_ACTIVE_USER_BY_EMAIL, {"email": email})
 
 
 async def create_user(db: AsyncSession, email: str, name: str | None = None) -> User:
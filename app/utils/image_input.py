@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import re
+from typing import Literal
+
+ImageInputKind = Literal["url", "b64", "data_url"]
+
+_DATA_URL_PREFIX = "data:"
+
+# Strict base64 alphabet with optional trailing padding (no whitespace).
+_BASE64_RE = re.compile(r"[A-Za-z0-9+/]*={0,2}")
+
+# Magic bytes for common image formats, matched in a single pass.
+# WebP is a RIFF container, so require the WEBP form type at offset 8.
+_IMAGE_MAGIC_RE = re.compile(
+    rb"(?P<jpeg>\xff\xd8\xff)"
+    rb"|(?P<png>\x89PNG\r\n\x1a\n)"
+    rb"|(?P<gif>GIF8[79]a)"
+    rb"|(?P<webp>RIFF.{4}WEBP)",
+    re.DOTALL,
+)
+_IMAGE_MIME_TYPES = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+}
+
+
+def classify_image_input(image_url: str | None, image_base64: str | None) -> tuple[ImageInputKind, str]:
+    """
+    Check that exactly one image input is given and classify it.
+
+    Returns:
+        ("url", image_url), ("data_url", image_base64) or ("b64", image_base64)
+
+    Raises:
+        ValueError if both or neither inputs are provided
+    """
+    if image_url:
+        if image_base64:
+            raise ValueError("Provide exactly one of image_url or image_base64.")
+        return "url", image_url
+    if not image_base64:
+        raise ValueError("Provide exactly one of image_url or image_base64.")
+    if image_base64.startswith(_DATA_URL_PREFIX):
+        return "data_url", image_base64
+    return "b64", image_base64
+
+
+def is_strict_base64(payload: str) -> bool:
+    """Check the shape of a base64 string without decoding it."""
+    return not len(payload) % 4 and _BASE64_RE.fullmatch(payload) is not None
+
+
+def validate_image_content(data: bytes) -> str:
+    """
+    Validate that the given bytes represent a valid image.
+
+    Returns:
+        The detected MIME type if valid
+
+    Raises:
+        ValueError if the content is not a recognized image format
+    """
+    m = _IMAGE_MAGIC_RE.match(data)
+    if m:
+        return _IMAGE_MIME_TYPES[m.lastgroup]
+
+    raise ValueError("Invalid image format. Supported formats: JPEG, PNG, GIF, WebP")
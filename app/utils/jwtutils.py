@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import base64
+import hashlib
+import hmac
+import json
 import logging
+import re
+import time
 from dataclasses import dataclass
 from typing import Any
 
 import jwt
+import orjson
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 
 from app.config import settings
+from app.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +26,73 @@ class TokenPayload:
     claims: dict[str, Any]
 
 
+# Upper bound on how long a validated token is cached; entries stop being
+# served _EXP_SKEW_SECONDS before the token's own exp claim.
+_MAX_CACHE_SECONDS = 300.0
+_EXP_SKEW_SECONDS = 5.0
+
+# Successfully validated tokens, so repeat calls skip signature verification.
+# Keyed by the token itself (not a digest) so a hit is always an exact match.
+# Values are (wall-clock deadline, payload); the deadline is re-checked on
+# every hit so a clock step can't extend a token past exp. Cached payloads
+# are shared; treat them as read-only.
+_validated_tokens: TTLCache[str, tuple[float, TokenPayload]] = TTLCache(maxsize=4096, ttl=_MAX_CACHE_SECONDS)
+
+_SECRET = settings.secret_key.encode("utf-8")
+_SEGMENT = re.compile(rb"[A-Za-z0-9_-]+")
+_TIME_CLAIMS = ("exp", "nbf", "iat")
+_STRING_CLAIMS = ("sub", "jti")
+
+
+def _b64url_decode(segment: bytes) -> bytes:
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+
+def _decode_hs256(token: str) -> dict[str, Any] | None:
+    """
+    Verify a plain HS256 token without PyJWT's generic machinery.
+
+    Only accepts the common case it fully checks: a {alg, typ} header, a
+    valid signature, integer time claims that have taken effect and not
+    expired, and no audience. Returns None for anything else, including
+    bad signatures, so PyJWT makes (and logs) the final decision.
+    """
+    try:
+        raw = token.encode("ascii")
+    except UnicodeEncodeError:
+        return None
+    parts = raw.split(b".")
+    if len(parts) != 3 or not all(_SEGMENT.fullmatch(p) for p in parts):
+        return None
+    header_b64, payload_b64, signature_b64 = parts
+    try:
+        header = orjson.loads(_b64url_decode(header_b64))
+        if not isinstance(header, dict) or header.get("alg") != "HS256" or not header.keys() <= {"alg", "typ"}:
+            return None
+        expected = hmac.new(_SECRET, header_b64 + b"." + payload_b64, hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature_b64)):
+            return None
+        # stdlib json, like PyJWT: orjson turns integers past 64 bits into floats.
+        payload = json.loads(_b64url_decode(payload_b64))
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or "aud" in payload:
+        return None
+
+    now = time.time()
+    for claim in _TIME_CLAIMS:
+        if claim in payload and type(payload[claim]) is not int:
+            return None
+    for claim in _STRING_CLAIMS:
+        if claim in payload and not isinstance(payload[claim], str):
+            return None
+    if "exp" in payload and payload["exp"] <= now:
+        return None
+    if any(claim in payload and payload[claim] > now for claim in ("nbf", "iat")):
+        return None
+    return payload
+
+
 def validate_token(token: str) -> TokenPayload | None:
     """
     Validate a JWT token and extract the payload.
@@ -28,18 +103,35 @@ def validate_token(token: str) -> TokenPayload | None:
     Returns:
         TokenPayload with user_id and claims if valid, None otherwise
     """
+    cached = _validated_tokens.get(token)
+    if cached is not None:
+        deadline, result = cached
+        if deadline > time.time():
+            return result
+        _validated_tokens.pop(token)
+
     try:
-        payload = jwt.decode(
-            token,
-            settings.secret_key,
-            algorithms=["HS256"],
-        )
+        payload = _decode_hs256(token) if settings.jwt_fast_path else None
+        if payload is None:
+            payload = jwt.decode(
+                token,
+                settings.secret_key,
+                algorithms=["HS256"],
+            )
         user_id = payload.get("userId") or payload.get("user_id") or payload.get("sub")
         if not user_id:
             logger.warning("JWT missing userId/user_id/sub claim")
             return None
 
-        return TokenPayload(user_id=str(user_id), claims=payload)
+        result = TokenPayload(user_id=str(user_id), claims=payload)
+        now = time.time()
+        deadline = now + _MAX_CACHE_SECONDS
+        exp = payload.get("exp")
+        if exp is not None:
+            deadline = min(deadline, float(exp) - _EXP_SKEW_SECONDS)
+        if deadline > now:
+            _validated_tokens.set(token, (deadline, result), ttl=deadline - now)
+        return result
 
     except ExpiredSignatureError:
         logger.warning("JWT token has expired")
@@ -49,6 +141,16 @@ def validate_token(token: str) -> TokenPayload | None:
         return None
 
 
+def invalidate_token(token: str) -> None:
+    """
+    Drop a token from the validation cache, e.g. on logout.
+
+    The token still verifies if presented again; this only stops this
+    process from holding on to its decoded claims.
+    """
+    _validated_tokens.pop(token)
+
+
 def extract_bearer_token(authorization_header: str | None) -> str | None:
     """
     Extract the token from a Bearer authorization header.
@@ -62,7 +164,9 @@ def extract_bearer_token(authorization_header: str | None) -> str | None:
     if not authorization_header:
         return None
 
-    parts = authorization_header.split()
+    # Exactly "<scheme> <token>" with any whitespace between; maxsplit=2 is
+    # enough to tell a third part exists without splitting the whole header.
+    parts = authorization_header.split(maxsplit=2)
     if len(parts) != 2 or parts[0].lower() != "bearer":
         return None
 
@@ -1,21 +1,123 @@
 from __future__ import annotations
 
-from fastapi import Request
+import functools
+import logging
+import math
+import time
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException, Request
+from limits import RateLimitItem, parse
+from limits.aio.storage import MemoryStorage
+from limits.aio.strategies import MovingWindowRateLimiter
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from app.config import settings
+from app.utils.redis_client import get_redis
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+    from redis.commands.core import AsyncScript
+
+logger = logging.getLogger(__name__)
+
+# Atomic token bucket: refill by elapsed time, take one token if available.
+# State is a hash {tokens, ts}; time comes from Redis so worker clocks don't
+# matter. Returns {allowed (0/1), retry_after_ms}.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry_after = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, retry_after}
+"""
+
+_KEY_PREFIX = "rate-limit:"
+
 
 def get_client_identifier(request: Request) -> str:
     """
     Get a unique identifier for the client.
 
     Uses x-session-id if available, otherwise falls back to IP address.
+    Both slowapi and rate_limit() ask for it, so it is computed once per
+    request and kept on request.state.rate_key.
+    """
+    rate_key = getattr(request.state, "rate_key", None)
+    if rate_key is None:
+        session_id = request.headers.get("x-session-id")
+        rate_key = f"session:{session_id}" if session_id else get_remote_address(request)
+        request.state.rate_key = rate_key
+    return rate_key
+
+
+# In-process fallback, used only when Redis isn't configured. Its counters
+# are per worker, so N workers allow N times the configured rate.
+limiter = Limiter(key_func=get_client_identifier, enabled=not settings.redis_url)
+
+# Per-worker limiter that rate_limit() falls back to while Redis is failing,
+# so an outage loosens the limit to per-worker instead of removing it.
+_fallback_limiter = MovingWindowRateLimiter(MemoryStorage())
+
+
+@functools.lru_cache(maxsize=1)
+def _token_bucket_script(client: Redis) -> AsyncScript:
+    # Scripts run via EVALSHA and are reloaded automatically on NOSCRIPT.
+    return client.register_script(_TOKEN_BUCKET_LUA)
+
+
+def rate_limit(scope: str, limit_value: str) -> Callable[[Request], Awaitable[None]]:
     """
-    session_id = request.headers.get("x-session-id")
-    if session_id:
-        return f"session:{session_id}"
-    return get_remote_address(request)
+    Build a dependency enforcing `limit_value` (e.g. "20/minute") per client.
+
+    With Redis configured, one atomic script call per request spends a token
+    from a bucket shared by all workers; otherwise this is a no-op and the
+    route's slowapi decorator applies. If the Redis call fails, the request
+    is checked against an in-process limit instead.
+    """
+    item = parse(limit_value)
+    capacity = item.amount
+    tokens_per_ms = item.amount / (item.get_expiry() * 1000)
+    detail = f"Rate limit exceeded: {item}"
+
+    async def dependency(request: Request) -> None:
+        client = get_redis()
+        if client is None:
+            return
+        key = f"{_KEY_PREFIX}{scope}:{get_client_identifier(request)}"
+        try:
+            allowed, retry_after_ms = await _token_bucket_script(client)(keys=[key], args=[capacity, tokens_per_ms])
+        except Exception:  # noqa: BLE001
+            logger.warning("Rate limit check failed; using in-process limit", exc_info=True)
+            allowed, retry_after_ms = await _check_fallback(item, key)
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail=detail,
+                headers={"Retry-After": str(math.ceil(retry_after_ms / 1000))},
+            )
+
+    return dependency
 
 
-# Create the limiter instance
-limiter = Limiter(key_func=get_client_identifier)
+async def _check_fallback(item: RateLimitItem, key: str) -> tuple[bool, float]:
+    if await _fallback_limiter.hit(item, key):
+        return True, 0
+    stats = await _fallback_limiter.get_window_stats(item, key)
+    return False, max(0.0, stats.reset_time - time.time()) * 1000
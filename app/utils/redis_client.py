@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+# Longest a command waits for a free pooled connection.
+_POOL_TIMEOUT_SECONDS = 1.0
+
+
+@functools.lru_cache(maxsize=1)
+def get_redis() -> Redis | None:
+    """
+    Return the process-wide Redis client, or None if REDIS_URL isn't set.
+
+    One client (and connection pool, capped at REDIS_MAX_CONNECTIONS) is
+    shared by the response cache and the rate limiter. `redis` is an
+    optional dependency, imported only here.
+    """
+    if not settings.redis_url:
+        return None
+    try:
+        import redis.asyncio as redis
+    except ImportError as e:
+        raise RuntimeError("REDIS_URL is set but the 'redis' package is not installed.") from e
+    # A blocking pool makes bursts wait briefly for a free connection instead
+    # of failing outright; callers treat Redis errors as soft failures.
+    pool = redis.BlockingConnectionPool.from_url(
+        settings.redis_url,
+        max_connections=settings.redis_max_connections,
+        timeout=_POOL_TIMEOUT_SECONDS,
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client, if it was ever created."""
+    if get_redis.cache_info().currsize:
+        client = get_redis()
+        if client is not None:
+            await client.aclose(close_connection_pool=True)
+        get_redis.cache_clear()
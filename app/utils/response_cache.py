@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+from typing import TYPE_CHECKING, Any, Protocol
+
+import orjson
+
+from app.config import settings
+from app.utils.redis_client import get_redis
+from app.utils.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "llm-response:"
+_MEMORY_MAX_ENTRIES = 1024
+
+
+class ResponseCache(Protocol):
+    async def get(self, key: str) -> str | None: ...
+
+    async def set(self, key: str, value: str) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+def response_cache_key(model: str, master_prompt: str, messages: list[dict[str, Any]]) -> str:
+    """
+    Build a cache key from the model, master prompt and messages.
+
+    The key covers the exact message list sent to the model, so a hit is
+    only ever a completion produced from identical context.
+    """
+    turns = [[m.get("role"), m.get("content")] for m in messages]
+    digest = hashlib.sha256(orjson.dumps([model, master_prompt, turns])).hexdigest()
+    return _KEY_PREFIX + digest
+
+
+class MemoryResponseCache:
+    """In-process LRU with per-entry expiry; used when Redis isn't configured."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = _MEMORY_MAX_ENTRIES) -> None:
+        self._entries: TTLCache[str, str] = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+
+    async def get(self, key: str) -> str | None:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: str) -> None:
+        self._entries.set(key, value)
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class RedisResponseCache:
+    """
+    Redis-backed cache shared across workers.
+
+    Redis errors are logged and treated as misses; the cache must never
+    fail a request that the model could have answered.
+    """
+
+    def __init__(self, client: Redis, ttl_seconds: float) -> None:
+        self._redis = client
+        self._ttl = int(ttl_seconds)
+
+    async def get(self, key: str) -> str | None:
+        try:
+            value = await self._redis.get(key)
+        except Exception:  # noqa: BLE001
+            logger.warning("Response cache read failed", exc_info=True)
+            return None
+        return value.decode() if value is not None else None
+
+    async def set(self, key: str, value: str) -> None:
+        try:
+            await self._redis.set(key, value, ex=self._ttl)
+        except Exception:  # noqa: BLE001
+            logger.warning("Response cache write failed", exc_info=True)
+
+    async def close(self) -> None:
+        # The shared client is closed by close_redis() on shutdown.
+        pass
+
+
+@functools.lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache | None:
+    """Return the process-wide response cache, or None if caching is off."""
+    ttl = settings.response_cache_ttl_seconds
+    if not ttl:
+        return None
+    client = get_redis()
+    if client is not None:
+        return RedisResponseCache(client, ttl)
+    return MemoryResponseCache(ttl)
+
+
+async def close_response_cache() -> None:
+    """Close the response cache, if it was ever created."""
+    if get_response_cache.cache_info().currsize:
+        cache = get_response_cache()
+        if cache is not None:
+            await cache.close()
+        get_response_cache.cache_clear()
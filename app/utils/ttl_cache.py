@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+D = TypeVar("D")
+
+# Pass as get()'s default to tell a miss apart from a cached None.
+MISSING: Any = object()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Small in-process LRU map whose entries expire after a TTL.
+
+    Not shared across workers; use it only for data where a few seconds of
+    staleness is acceptable or where every write path invalidates it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K, default: D = None) -> V | D:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store value, optionally with a TTL other than the default."""
+        self._entries[key] = (time.monotonic() + (self._ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def normalize_uuid(value: str | None) -> str | None:
+    """
+    Return the canonical string form of a client-supplied UUID.
+
+    ID columns are native UUIDs, and some drivers raise on malformed
+    input, so callers should treat None as "no such row".
+
+    Returns:
+        The lowercase hyphenated UUID string, or None if value isn't a UUID
+    """
+    if not value:
+        return None
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        return None
+
+
+def uuid7() -> str:
+    """
+    Return a new time-ordered (version 7) UUID string.
+
+    The 12-bit counter after the millisecond timestamp makes ids from this
+    process strictly increasing, so rows inserted together sort in insertion
+    order even when they share a created_at.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _uuid7_last_ms:
+            _uuid7_last_ms = now_ms
+            _uuid7_counter = 0
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                # Counter exhausted for this millisecond; borrow the next one.
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        ms, counter = _uuid7_last_ms, _uuid7_counter
+    rand = int.from_bytes(os.urandom(8)) & 0x3FFF_FFFF_FFFF_FFFF
+    value = (ms & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand
+    return str(uuid.UUID(int=value))
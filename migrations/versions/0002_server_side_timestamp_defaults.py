@@ -0,0 +1,46 @@
+"""server-side timestamp defaults
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-14 18:17:20.800143
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.functions import utcnow
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column) pairs that get a database-side UTC default.
+_TIMESTAMP_COLUMNS = [
+    ("ambio_ai_chat", "created_at"),
+    ("ambio_ai_chat_history", "created_at"),
+    ("ambio_ai_user_session", "created_at"),
+    ("ambio_ai_prompts", "created_at"),
+    ("ambio_ai_prompts", "updated_at"),
+    ("users", "created_at"),
+    ("users", "updated_at"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in _TIMESTAMP_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.DateTime(), server_default=utcnow())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in _TIMESTAMP_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.DateTime(), server_default=None)
@@ -0,0 +1,54 @@
+"""unique active session per reference
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-14 18:30:02.114508
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Racing session creation could have left several active sessions for
+    # one reference; keep the newest and deactivate the rest so the unique
+    # index can be built.
+    op.execute(
+        """
+        UPDATE ambio_ai_user_session SET is_active = FALSE
+        WHERE is_active AND EXISTS (
+            SELECT 1 FROM ambio_ai_user_session AS newer
+            WHERE newer.unique_reference_id = ambio_ai_user_session.unique_reference_id
+              AND newer.reference_type = ambio_ai_user_session.reference_type
+              AND newer.is_active
+              AND (
+                newer.created_at > ambio_ai_user_session.created_at
+                OR (newer.created_at = ambio_ai_user_session.created_at
+                    AND newer.session_id > ambio_ai_user_session.session_id)
+              )
+        )
+        """
+    )
+    op.create_index(
+        'uq_user_session_active_reference',
+        'ambio_ai_user_session',
+        ['unique_reference_id', 'reference_type'],
+        unique=True,
+        postgresql_where=sa.text('is_active'),
+        sqlite_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_user_session_active_reference', table_name='ambio_ai_user_session')
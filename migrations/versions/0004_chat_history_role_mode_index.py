@@ -0,0 +1,29 @@
+"""chat history (chat_id, role, mode) index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-14 18:41:27.530916
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('ambio_ai_chat_history', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_history_chat_role_mode', ['chat_id', 'role', 'mode'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('ambio_ai_chat_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_history_chat_role_mode')
@@ -0,0 +1,31 @@
+"""chat history keyset index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-14 18:52:10.406271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('ambio_ai_chat_history', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_history_chat_created_id', ['chat_id', 'created_at', 'chat_history_id'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_ambio_ai_chat_history_chat_id'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('ambio_ai_chat_history', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ambio_ai_chat_history_chat_id'), ['chat_id'], unique=False)
+        batch_op.drop_index('ix_chat_history_chat_created_id')
@@ -0,0 +1,73 @@
+"""native uuid id columns
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-14 19:40:27.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, nullable) for every id and id reference stored as VARCHAR(64).
+_ID_COLUMNS = [
+    ("ambio_ai_chat", "chat_id", False),
+    ("ambio_ai_chat", "session_id", False),
+    ("ambio_ai_chat_history", "chat_history_id", False),
+    ("ambio_ai_chat_history", "chat_id", False),
+    ("ambio_ai_chat_history", "previous_message_id", True),
+    ("ambio_ai_user_session", "session_id", False),
+    ("ambio_ai_prompts", "prompt_id", False),
+    ("users", "user_id", False),
+]
+
+
+def _native_uuid() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    native = _native_uuid()
+    for table, column, nullable in _ID_COLUMNS:
+        if not native:
+            # Elsewhere Uuid is CHAR(32) holding hex without dashes.
+            col = sa.column(column, sa.String())
+            op.execute(sa.table(table, col).update().values({column: sa.func.replace(col, "-", "")}))
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.String(length=64),
+                type_=sa.Uuid(as_uuid=False),
+                existing_nullable=nullable,
+                postgresql_using=f"{column}::uuid",
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    native = _native_uuid()
+    for table, column, nullable in _ID_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.Uuid(as_uuid=False),
+                type_=sa.String(length=64),
+                existing_nullable=nullable,
+                postgresql_using=f"{column}::text",
+            )
+        if not native:
+            col = sa.column(column, sa.String())
+            dashed = sa.func.substr(col, 1, 8, type_=sa.String())
+            for start, length in ((9, 4), (13, 4), (17, 4), (21, 12)):
+                dashed = dashed + "-" + sa.func.substr(col, start, length, type_=sa.String())
+            op.execute(sa.table(table, col).update().values({column: dashed}))
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
 import os
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
 
 # Set test environment variables before importing app
 os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
@@ -19,47 +19,85 @@ os.environ["ADMIN_API_TOKEN"] = "test-admin-token"
 from app.database.base import Base
 from app.database.database import get_db
 from app.main import app
+from app.utils.rate_limiter import limiter
 
 
-# Create test database engine
+# One in-memory database shared by every connection (StaticPool), so the
+# schema is created once per run rather than per test.
 test_engine = create_async_engine(
     "sqlite+aiosqlite:///:memory:",
-    poolclass=NullPool,
-)
-
-TestSessionLocal = sessionmaker(
-    bind=test_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
+    poolclass=StaticPool,
+    connect_args={"check_same_thread": False},
 )
 
 
-async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with TestSessionLocal() as session:
-        yield session
+# The sqlite3 driver manages transactions itself, which breaks SAVEPOINTs
+# nested in an outer transaction. Let SQLAlchemy emit BEGIN instead.
+@event.listens_for(test_engine.sync_engine, "connect")
+def _disable_driver_transactions(dbapi_connection: Any, connection_record: Any) -> None:
+    dbapi_connection.isolation_level = None
 
 
-app.dependency_overrides[get_db] = override_get_db
+@event.listens_for(test_engine.sync_engine, "begin")
+def _emit_begin(conn: Any) -> None:
+    conn.exec_driver_sql("BEGIN")
 
 
-@pytest_asyncio.fixture
-async def async_client() -> AsyncGenerator[AsyncClient, None]:
-    # Create tables
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def _schema() -> AsyncGenerator[None, None]:
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    yield
+    await test_engine.dispose()
+
 
+@pytest_asyncio.fixture
+async def db_connection() -> AsyncGenerator[AsyncConnection, None]:
+    """
+    A connection inside an outer transaction that is rolled back after the
+    test. Sessions bound to it turn commit() into releasing a SAVEPOINT, so
+    nothing a test writes outlives it.
+    """
+    async with test_engine.connect() as conn:
+        trans = await conn.begin()
+        yield conn
+        await trans.rollback()
+
+
+def _session_for(conn: AsyncConnection) -> AsyncSession:
+    return AsyncSession(bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint")
+
+
+@pytest_asyncio.fixture(scope="module")
+async def _shared_client() -> AsyncGenerator[AsyncClient, None]:
+    # The client holds no per-test state (the app sets no cookies), so one
+    # per test module is enough; isolation comes from db_connection.
     async with AsyncClient(
         transport=ASGITransport(app=app),
         base_url="http://test",
+        timeout=None,
     ) as client:
         yield client
 
-    # Drop tables
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest_asyncio.fixture
+async def async_client(
+    _shared_client: AsyncClient, db_connection: AsyncConnection
+) -> AsyncGenerator[AsyncClient, None]:
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        async with _session_for(db_connection) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Rate-limit counters are process-wide; start each test with a clean slate.
+    limiter.reset()
+
+    yield _shared_client
+
+    app.dependency_overrides.pop(get_db, None)
 
 
 @pytest_asyncio.fixture
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
-    async with TestSessionLocal() as session:
+async def db_session(db_connection: AsyncConnection) -> AsyncGenerator[AsyncSession, None]:
+    async with _session_for(db_connection) as session:
         yield session
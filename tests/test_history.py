@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import json
+import uuid
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ambio_ai_chat import AmbioAiChat
+from app.models.enums import ChatRole
+from app.utils.database_utils.chat_history_utils import create_chat_messages, get_chat_history_by_chat_id
+from app.utils.database_utils.chat_utils import get_or_create_chat
 
 
 @pytest.mark.asyncio
@@ -67,3 +76,76 @@ async def test_chat_ownership_enforcement(async_client: AsyncClient) -> None:
         headers={"x-session-id": session_id},
     )
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_chat_messages_batch(db_session: AsyncSession) -> None:
+    """Test that a batch is inserted in order with server defaults populated."""
+    chat_id = str(uuid.uuid4())
+    msgs = await create_chat_messages(
+        db_session,
+        [
+            {"chat_id": chat_id, "role": role, "mode": "chat", "content": str(i), "meta": None}
+            for i, role in enumerate([ChatRole.USER, ChatRole.ASSISTANT, ChatRole.USER])
+        ],
+    )
+    assert [m.content for m in msgs] == ["0", "1", "2"]
+    assert all(m.created_at is not None for m in msgs)
+
+    history, next_cursor = await get_chat_history_by_chat_id(db_session, chat_id)
+    assert [m["chat_history_id"] for m in reversed(history)] == [m.chat_history_id for m in msgs]
+    assert next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_get_chat_history_pages(db_session: AsyncSession) -> None:
+    """Test that paging with the returned cursor walks the whole chat once."""
+    chat_id = str(uuid.uuid4())
+    await create_chat_messages(
+        db_session,
+        [{"chat_id": chat_id, "role": ChatRole.USER, "mode": "chat", "content": str(i), "meta": None} for i in range(5)],
+    )
+    seen: list[str] = []
+    cursor = None
+    while True:
+        page, cursor = await get_chat_history_by_chat_id(db_session, chat_id, before=cursor, limit=2)
+        seen.extend(m["content"] for m in page)
+        if cursor is None:
+            break
+    assert seen == ["4", "3", "2", "1", "0"]
+
+
+@pytest.mark.asyncio
+async def test_export_chat_history(async_client: AsyncClient, db_session: AsyncSession) -> None:
+    """Test that export streams every message as NDJSON, oldest first."""
+    session_id = (await async_client.post("/api/v1/session")).json()["session_id"]
+    chat = AmbioAiChat(session_id=session_id, title="export")
+    db_session.add(chat)
+    await db_session.commit()
+    await create_chat_messages(
+        db_session,
+        [{"chat_id": chat.chat_id, "role": ChatRole.USER, "mode": "chat", "content": str(i), "meta": None} for i in range(3)],
+    )
+
+    response = await async_client.get(
+        f"/api/v1/chat-history/{chat.chat_id}/export",
+        headers={"x-session-id": session_id},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["content"] for line in lines] == ["0", "1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_chat_scoped_to_session(db_session: AsyncSession) -> None:
+    """Test that a chat is reused only by the session that owns it."""
+    owner, other = str(uuid.uuid4()), str(uuid.uuid4())
+    chat, created = await get_or_create_chat(db=db_session, session_id=owner, chat_id=None, prompt="hello")
+    assert created and chat.created_at is not None
+
+    again, created = await get_or_create_chat(db=db_session, session_id=owner, chat_id=chat.chat_id, prompt="x")
+    assert again.chat_id == chat.chat_id and not created
+
+    foreign, created = await get_or_create_chat(db=db_session, session_id=other, chat_id=chat.chat_id, prompt="x")
+    assert created and foreign.chat_id != chat.chat_id and foreign.session_id == other
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import fakeredis
+import pytest
+from fastapi import HTTPException, Request
+
+from app.utils import rate_limiter
+from app.utils.rate_limiter import rate_limit
+
+
+def _request(session_id: str) -> Request:
+    return Request({"type": "http", "headers": [(b"x-session-id", session_id.encode())], "client": ("127.0.0.1", 1)})
+
+
+async def _denied(dependency: Callable[[Request], Awaitable[None]], session_id: str) -> HTTPException | None:
+    try:
+        await dependency(_request(session_id))
+    except HTTPException as e:
+        return e
+    return None
+
+
+@pytest.fixture
+def redis_server(monkeypatch: pytest.MonkeyPatch) -> fakeredis.FakeServer:
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(rate_limiter, "get_redis", lambda: client)
+    return server
+
+
+class TestTokenBucket:
+    """Tests for the Redis-backed rate_limit() dependency."""
+
+    async def test_allows_up_to_capacity_then_denies(self, redis_server: fakeredis.FakeServer) -> None:
+        """Test that a full bucket allows `amount` requests, then returns 429 with Retry-After."""
+        dependency = rate_limit("bucket-deny", "3/minute")
+        for _ in range(3):
+            assert await _denied(dependency, "client-a") is None
+
+        error = await _denied(dependency, "client-a")
+        assert error is not None
+        assert error.status_code == 429
+        assert error.headers is not None
+        assert int(error.headers["Retry-After"]) >= 1
+        # Buckets are per client.
+        assert await _denied(dependency, "client-b") is None
+
+    async def test_refills_over_time(self, redis_server: fakeredis.FakeServer) -> None:
+        """Test that tokens come back at the configured rate."""
+        dependency = rate_limit("bucket-refill", "10/second")
+        for _ in range(10):
+            assert await _denied(dependency, "client-a") is None
+        assert await _denied(dependency, "client-a") is not None
+
+        await asyncio.sleep(0.15)
+        assert await _denied(dependency, "client-a") is None
+
+    async def test_redis_error_falls_back_to_in_process_limit(self, redis_server: fakeredis.FakeServer) -> None:
+        """Test that a Redis outage still enforces the limit per worker."""
+        redis_server.connected = False
+        dependency = rate_limit("bucket-fallback", "2/minute")
+        for _ in range(2):
+            assert await _denied(dependency, "client-a") is None
+
+        error = await _denied(dependency, "client-a")
+        assert error is not None
+        assert error.status_code == 429
+        assert error.headers is not None
+        assert int(error.headers["Retry-After"]) >= 1
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from app.utils.response_cache import MemoryResponseCache, response_cache_key
+
+
+class TestResponseCacheKey:
+    """Tests for LLM response cache keys."""
+
+    def test_exact_content(self) -> None:
+        """Test that prompts differing only in case or spacing don't share a key."""
+        a = response_cache_key("m", "p", [{"role": "user", "content": "Hello  world"}])
+        b = response_cache_key("m", "p", [{"role": "user", "content": " hello world "}])
+        assert a != b
+
+    def test_covers_full_history(self) -> None:
+        """Test that earlier context is part of the key, not just the last turns."""
+        tail = [{"role": "user", "content": str(i)} for i in range(6)]
+        a = response_cache_key("m", "p", [{"role": "user", "content": "secret A"}, *tail])
+        b = response_cache_key("m", "p", [{"role": "user", "content": "secret B"}, *tail])
+        assert a != b
+
+    def test_scoped_by_model_and_prompt(self) -> None:
+        """Test that model and master prompt are part of the key."""
+        msgs = [{"role": "user", "content": "hi"}]
+        key = response_cache_key("m", "p", msgs)
+        assert key != response_cache_key("other", "p", msgs)
+        assert key != response_cache_key("m", "other", msgs)
+
+
+class TestMemoryResponseCache:
+    """Tests for the in-process response cache."""
+
+    async def test_set_and_get(self) -> None:
+        """Test round-tripping a value."""
+        cache = MemoryResponseCache(ttl_seconds=60)
+        await cache.set("k", "v")
+        assert await cache.get("k") == "v"
+        assert await cache.get("missing") is None
+
+    async def test_expired_entries_miss(self) -> None:
+        """Test that entries past their TTL are not returned."""
+        cache = MemoryResponseCache(ttl_seconds=0)
+        await cache.set("k", "v")
+        assert await cache.get("k") is None
+
+    async def test_evicts_least_recently_used(self) -> None:
+        """Test that the oldest entry is evicted once full."""
+        cache = MemoryResponseCache(ttl_seconds=60, max_entries=2)
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        await cache.get("a")
+        await cache.set("c", "3")
+        assert await cache.get("a") == "1"
+        assert await cache.get("b") is None
@@ -2,6 +2,15 @@ from __future__ import annotations
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ambio_ai_user_session import AmbioAiUserSession
+from app.models.enums import ReferenceType
+from app.utils.database_utils.session_utils import (
+    create_signed_in_session,
+    get_active_session,
+    invalidate_all_sessions_for_user,
+)
 
 
 @pytest.mark.asyncio
@@ -82,3 +91,41 @@ async def test_delete_session_invalid_session(async_client: AsyncClient) -> None
         headers={"x-session-id": "invalid-session-id"},
     )
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_invalidate_all_sessions_for_user(db_session: AsyncSession) -> None:
+    """Test that only the user's active sessions are invalidated."""
+    sessions = [
+        AmbioAiUserSession(unique_reference_id="bulk-user", reference_type=ReferenceType.SIGNED_IN_USER),
+        AmbioAiUserSession(unique_reference_id="bulk-user", reference_type=ReferenceType.NON_SIGNED_IN_USER),
+        AmbioAiUserSession(
+            unique_reference_id="bulk-user", reference_type=ReferenceType.SIGNED_IN_USER, is_active=False
+        ),
+        AmbioAiUserSession(unique_reference_id="other-user", reference_type=ReferenceType.SIGNED_IN_USER),
+    ]
+    db_session.add_all(sessions)
+    await db_session.commit()
+    assert await get_active_session(db_session, sessions[0].session_id) is not None
+
+    assert await invalidate_all_sessions_for_user(db_session, "bulk-user") == 2
+    assert await get_active_session(db_session, sessions[0].session_id) is None
+    assert await get_active_session(db_session, sessions[3].session_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_create_session_raises_when_upsert_finds_nothing(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a lost insert/select race raises instead of returning None."""
+    calls = 0
+
+    async def scalar(*args: object, **kwargs: object) -> None:
+        nonlocal calls
+        calls += 1
+
+    monkeypatch.setattr(db_session, "scalar", scalar)
+    with pytest.raises(RuntimeError):
+        await create_signed_in_session(db=db_session, user_id="race-user")
+    # INSERT and SELECT, then one retry of each.
+    assert calls == 4
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+from app.llm_services.domain_llm_wrapper import coalesce_tokens
+
+
+class TestCoalesceTokens:
+    """Tests for merging streamed tokens."""
+
+    async def test_closes_source_when_consumer_stops_early(self) -> None:
+        """Test that stopping mid-stream closes the upstream generator, even with a read in flight."""
+        closed = False
+
+        async def source() -> AsyncIterator[str]:
+            nonlocal closed
+            try:
+                yield "a"
+                yield "b"
+                await asyncio.sleep(10)
+                yield "never"
+            finally:
+                closed = True
+
+        stream = coalesce_tokens(source(), window_ms=1)
+        received = []
+        async for chunk in stream:
+            received.append(chunk)
+            if len(received) == 2:
+                break
+        await stream.aclose()
+
+        assert received == ["a", "b"]
+        assert closed
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from app.utils.ttl_cache import MISSING, TTLCache
+
+
+class TestTTLCache:
+    """Tests for the in-process TTL cache."""
+
+    def test_caches_none_distinctly_from_miss(self) -> None:
+        """Test that a cached None can be told apart from a miss."""
+        cache: TTLCache[str, str | None] = TTLCache(maxsize=4, ttl=60)
+        cache.set("neg", None)
+        assert cache.get("neg", MISSING) is None
+        assert cache.get("absent", MISSING) is MISSING
+
+    def test_per_entry_ttl(self) -> None:
+        """Test that set() can override the default TTL."""
+        cache: TTLCache[str, str] = TTLCache(maxsize=4, ttl=60)
+        cache.set("short", "v", ttl=0)
+        cache.set("long", "v")
+        assert cache.get("short") is None
+        assert cache.get("long") == "v"
+
+    def test_pop(self) -> None:
+        """Test that popped entries are gone and missing keys are ignored."""
+        cache: TTLCache[str, str] = TTLCache(maxsize=4, ttl=60)
+        cache.set("k", "v")
+        cache.pop("k")
+        cache.pop("k")
+        assert cache.get("k") is None
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import time
+
+import jwt
 import pytest
 
-from app.llm_services.domain_llm_wrapper import (
-    validate_image_content,
-    validate_image_url,
-)
-from app.utils.jwtutils import extract_bearer_token, validate_token
+from app.llm_services.domain_llm_wrapper import validate_image_url
+from app.config import settings
+from app.utils.image_input import classify_image_input, validate_image_content
+from app.utils.jwtutils import _decode_hs256, _validated_tokens, extract_bearer_token, invalidate_token, validate_token
 
 
 class TestImageUrlValidation:
@@ -74,6 +76,11 @@ class TestImageContentValidation:
         webp_header = b"RIFF\x00\x00\x00\x00WEBP"
         assert validate_image_content(webp_header) == "image/webp"
 
+    def test_rejects_non_webp_riff(self) -> None:
+        """Test that other RIFF containers (e.g. WAV) are not treated as WebP."""
+        with pytest.raises(ValueError, match="Invalid image format"):
+            validate_image_content(b"RIFF\x00\x00\x00\x00WAVEfmt ")
+
     def test_rejects_invalid_format(self) -> None:
         """Test rejection of non-image content."""
         with pytest.raises(ValueError, match="Invalid image format"):
@@ -83,6 +90,30 @@ class TestImageContentValidation:
             validate_image_content(b"<html><body>Hello</body></html>")
 
 
+class TestImageInputClassification:
+    """Tests for classifying image_url / image_base64 inputs."""
+
+    def test_classifies_url(self) -> None:
+        """Test that an image URL is classified as url."""
+        assert classify_image_input("https://example.com/a.png", None) == ("url", "https://example.com/a.png")
+
+    def test_classifies_base64(self) -> None:
+        """Test raw base64 vs data URL classification."""
+        assert classify_image_input(None, "iVBORw0KGgo=") == ("b64", "iVBORw0KGgo=")
+        assert classify_image_input(None, "data:image/png;base64,iVBORw0KGgo=") == (
+            "data_url",
+            "data:image/png;base64,iVBORw0KGgo=",
+        )
+
+    def test_requires_exactly_one(self) -> None:
+        """Test that both or neither inputs are rejected."""
+        with pytest.raises(ValueError, match="exactly one"):
+            classify_image_input(None, None)
+
+        with pytest.raises(ValueError, match="exactly one"):
+            classify_image_input("https://example.com/a.png", "iVBORw0KGgo=")
+
+
 class TestJwtUtils:
     """Tests for JWT utilities."""
 
@@ -114,11 +145,62 @@ class TestJwtUtils:
         token = extract_bearer_token("just-a-token")
         assert token is None
 
+    def test_extract_bearer_token_missing_token(self) -> None:
+        """Test Bearer prefix with no token."""
+        assert extract_bearer_token("Bearer ") is None
+        assert extract_bearer_token("Bearer    ") is None
+
+    def test_extract_bearer_token_single_token_only(self) -> None:
+        """Test that extra parts are rejected and any whitespace separates."""
+        assert extract_bearer_token("Bearer a b") is None
+        assert extract_bearer_token("Bearer\tmy-token") == "my-token"
+        assert extract_bearer_token("  Bearer   my-token  ") == "my-token"
+
     def test_validate_token_invalid(self) -> None:
         """Test that invalid tokens return None."""
         result = validate_token("invalid-token")
         assert result is None
 
+    def test_validate_token_valid(self) -> None:
+        """Test that a valid token validates, including on a cached repeat."""
+        token = jwt.encode({"sub": "user-1", "exp": int(time.time()) + 60}, settings.secret_key, algorithm="HS256")
+        first = validate_token(token)
+        assert first is not None and first.user_id == "user-1"
+        assert validate_token(token) == first
+
+    def test_fast_path_matches_pyjwt(self) -> None:
+        """Test that the HS256 fast path decodes plain tokens like PyJWT does."""
+        now = int(time.time())
+        claims = {"sub": "user-3", "iat": now, "exp": now + 60, "big": 10**30}
+        token = jwt.encode(claims, settings.secret_key, algorithm="HS256")
+        assert _decode_hs256(token) == jwt.decode(token, settings.secret_key, algorithms=["HS256"])
+
+    def test_fast_path_defers_unusual_tokens(self) -> None:
+        """Test that tokens outside the fast path's checks are left to PyJWT."""
+        now = int(time.time())
+        for claims, key in (
+            ({"sub": "u", "exp": now + 60}, "wrong-secret"),
+            ({"sub": "u", "exp": now - 1}, settings.secret_key),
+            ({"sub": "u", "nbf": now + 60}, settings.secret_key),
+            ({"sub": "u", "aud": "other"}, settings.secret_key),
+        ):
+            token = jwt.encode(claims, key, algorithm="HS256")
+            assert _decode_hs256(token) is None
+            assert validate_token(token) is None
+
+    def test_validate_token_not_cached_near_expiry(self) -> None:
+        """Test that tokens within the expiry skew are validated but not cached."""
+        token = jwt.encode({"sub": "user-4", "exp": int(time.time()) + 3}, settings.secret_key, algorithm="HS256")
+        assert validate_token(token) is not None
+        assert _validated_tokens.get(token) is None
+
+    def test_invalidate_token(self) -> None:
+        """Test that invalidate_token drops the cached entry."""
+        token = jwt.encode({"sub": "user-2", "exp": int(time.time()) + 60}, settings.secret_key, algorithm="HS256")
+        assert validate_token(token) is not None
+        invalidate_token(token)
+        assert _validated_tokens.get(token) is None
+
     def test_validate_token_expired(self) -> None:
         """Test that expired tokens return None."""
         # This is an expired JWT (exp in the past)